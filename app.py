@@ -1,13 +1,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from prophet import Prophet
-from textblob import TextBlob
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import difflib
-from newsapi import NewsApiClient
-from pytrends.request import TrendReq
+import io
+import os
+
+# Prophet, pytrends, NewsAPI, TextBlob, wordcloud and matplotlib are imported
+# lazily by the step that needs them, so the page renders before they load.
+from core import business_summary, default_fetcher, forecast_history, growth_advice, load_dataset
+from dataset_store import DatasetStore
+from forecasting import ENGINES, ForecastCache, backtest, forecast as run_forecast, forecast_many
+from ingest import detect_columns, detect_format, read_sample
+from pipeline_cache import PipelineCache, make_cache_key
+from profiling import StageProfiler
+from rollup import GRANULARITIES, MAX_PLOT_POINTS, downsample
+from sentiment import LABELS, SentimentEngine, analyze_reviews, detect_review_columns
 
 st.set_page_config(page_title="BizInsight AI", layout="wide")
 st.title("📊 BizInsight AI – Business Intelligence Dashboard")
@@ -17,82 +23,187 @@ st.title("📊 BizInsight AI – Business Intelligence Dashboard")
 # =============================
 st.header("📁 Upload Business Data")
 
-uploaded_file = st.file_uploader("Upload your business data (CSV only)", type=["csv"])
-if uploaded_file:
+TREND_TITLES = {"Day": "Daily", "Week": "Weekly", "Month": "Monthly"}
+STORE_DIR = os.environ.get("BIZINSIGHT_STORE", os.path.join(os.path.expanduser("~"), ".bizinsight", "store"))
+
+
+@st.cache_resource
+def get_pipeline_cache():
+    # One cache per server process, shared across reruns and sessions
+    return PipelineCache()
+
+
+@st.cache_resource
+def get_forecast_cache():
+    return ForecastCache()
+
+
+@st.cache_resource
+def get_sentiment_engine():
+    return SentimentEngine()
+
+
+@st.cache_resource
+def get_signal_fetcher():
+    return default_fetcher(api_key=st.secrets.get("NEWSAPI_KEY", "8b3e20485b4943d190d06f67eee4df6b"))
+
+
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore(STORE_DIR)
+
+
+# Fresh profiler per rerun; the Performance panel at the bottom shows what this run cost
+profiler = StageProfiler()
+show_performance = st.sidebar.checkbox("⏱️ Show performance panel", value=False)
+
+keep_history = st.sidebar.checkbox("💾 Keep history in local store", value=False,
+                                   help="Append each upload to a persistent local dataset instead of "
+                                        "analyzing it on its own.")
+store = get_dataset_store() if keep_history else None
+if store is not None and not store.empty:
+    store_info = store.info()
+    st.sidebar.caption(f"💾 Stored history: {store_info['rows']:,} rows over {store_info['months']} months "
+                       f"from {store_info['uploads']} uploads")
+
+uploaded_file = st.file_uploader("Upload your business data (CSV, Parquet or Arrow)",
+                                 type=["csv", "parquet", "arrow", "feather"])
+if uploaded_file or (store is not None and not store.empty):
     try:
-        df = pd.read_csv(uploaded_file, encoding='ISO-8859-1')
-
-        # Define column matching function
-        def auto_match_column(possible_names, df_cols):
-            for name in possible_names:
-                match = difflib.get_close_matches(name, df_cols, n=1, cutoff=0.7)
-                if match:
-                    return match[0]
-            return None
-
-        # Clean and convert sales column
-        sales_col_raw = auto_match_column(["Sales", "Revenue", "Amount", "Total"], df.columns)
-        if sales_col_raw:
-            df[sales_col_raw] = pd.to_numeric(
-                df[sales_col_raw].astype(str).str.replace(',', '').str.replace('$', ''), errors='coerce')
-
-        st.success("✅ File uploaded successfully!")
-
-        order_date_col = auto_match_column(["Order Date", "Date", "order_date"], df.columns)
-        sales_col = auto_match_column(["Sales", "Revenue", "Amount", "Total"], df.columns)
-        product_col = auto_match_column(["Product Name", "Item", "Product"], df.columns)
-
-        if not order_date_col:
-            order_date_col = st.selectbox("Select Date Column", df.columns)
-        if not sales_col:
-            numeric_cols = df.select_dtypes(include='number').columns.tolist()
-            if numeric_cols:
-                sales_col = st.selectbox("Select Sales Column", numeric_cols)
-            else:
-                st.error("❌ No numeric columns found for sales.")
-                st.stop()
-        if not product_col:
-            product_col = st.selectbox("Select Product Column", df.columns)
+        if not uploaded_file:
+            # No new upload: show the stored history as-is
+            st.info("💾 Showing stored history. Upload a file to append new orders.")
+            with profiler.stage("store_load"):
+                dataset = store.dataset()
+            order_date_col, sales_col, product_col = (store.columns[k] for k in ("date", "sales", "product"))
+            pipeline_cache = get_pipeline_cache()
+        else:
+            file_bytes = uploaded_file.getvalue()
+            file_format = detect_format(uploaded_file.name)
+            # Only the first chunk is needed to work out the column mapping
+            with profiler.stage("read_sample"):
+                sample = read_sample(io.BytesIO(file_bytes), file_format)
 
-        try:
-            df[order_date_col] = pd.to_datetime(df[order_date_col], errors='coerce', infer_datetime_format=True)
-        except Exception as e:
-            st.error(f"❌ Failed to parse dates. Error: {e}")
-            st.stop()
+            st.success("✅ File uploaded successfully!")
+
+            with profiler.stage("match_columns", len(sample)):
+                detected = detect_columns(sample)
+            if store is not None and store.columns:
+                # Stick to the stored history's columns when the upload has them
+                detected.update({k: v for k, v in store.columns.items() if v in sample.columns})
+            order_date_col = detected["date"]
+            sales_col = detected["sales"]
+            product_col = detected["product"]
 
-        if df[sales_col].isna().all():
-            st.error("❌ Sales column could not be converted to numbers. Please check your file format.")
-            st.stop()
+            if not order_date_col:
+                order_date_col = st.selectbox("Select Date Column", sample.columns)
+            if not sales_col:
+                numeric_cols = sample.select_dtypes(include='number').columns.tolist()
+                if numeric_cols:
+                    sales_col = st.selectbox("Select Sales Column", numeric_cols)
+                else:
+                    st.error("❌ No numeric columns found for sales.")
+                    st.stop()
+            if not product_col:
+                product_col = st.selectbox("Select Product Column", sample.columns)
 
-        df = df.dropna(subset=[order_date_col, sales_col])
-        if df.empty:
-            st.error("⚠️ No valid rows after cleaning. Please check your data.")
-            st.stop()
+            pipeline_cache = get_pipeline_cache()
+            cache_key = make_cache_key(file_bytes, {
+                "format": file_format, "date": order_date_col,
+                "sales": sales_col, "product": product_col,
+            })
+
+            if store is not None:
+                # Append the upload as a delta; re-running on the same file is a no-op
+                if not store.has_upload(cache_key):
+                    try:
+                        with st.spinner("Appending upload to stored history..."), \
+                                profiler.stage("store_append") as append_stage:
+                            delta = store.append(io.BytesIO(file_bytes), file_format, order_date_col,
+                                                 sales_col, product_col, digest=cache_key)
+                            append_stage.rows += delta["rows_read"]
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        st.stop()
+                    st.info(f"💾 Added {delta['rows_added']:,} new rows to {len(delta['months'])} month(s), "
+                            f"skipped {delta['duplicates']:,} duplicates.")
+                with profiler.stage("store_load"):
+                    dataset = store.dataset()
+            else:
+                with profiler.stage("pipeline_cache_lookup"):
+                    cached = pipeline_cache.get(cache_key)
+                if cached is not None:
+                    dataset = cached[1]["dataset"]
+                else:
+                    try:
+                        dataset = load_dataset(io.BytesIO(file_bytes), file_format, order_date_col,
+                                               sales_col, product_col, sample=sample, profiler=profiler)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        st.stop()
+                    pipeline_cache.put(cache_key, dataset.preview, {"dataset": dataset})
+
+        product_sales = dataset.product_sales
+        cube = dataset.rollup
+
+        cache_stats = pipeline_cache.stats()
+        st.sidebar.caption(
+            f"🗄️ Pipeline cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+            f"{cache_stats['entries']} entries")
 
         st.subheader("📋 Data Preview")
-        st.dataframe(df.head(10))
+        st.dataframe(dataset.preview)
+
+        with st.expander("🧹 Cleaning report"):
+            st.dataframe(pd.Series(dataset.cleaning_report, name="Rows").rename_axis("Rule"))
 
         st.subheader("📈 Revenue Over Time")
-        monthly_sales = df.set_index(order_date_col).resample('M')[sales_col].sum().reset_index()
-        fig1 = px.line(monthly_sales, x=order_date_col, y=sales_col, title="Monthly Sales Trend")
+        first_day, last_day = cube.date_range()
+        col_gran, col_range = st.columns(2)
+        granularity = col_gran.radio("Granularity", list(GRANULARITIES), index=2, horizontal=True)
+        picked_range = col_range.date_input("Date range", (first_day.date(), last_day.date()),
+                                            min_value=first_day.date(), max_value=last_day.date())
+        range_start, range_end = picked_range if len(picked_range) == 2 else (first_day, last_day)
+
+        with profiler.stage("rollup_series"):
+            trend_df = cube.series(GRANULARITIES[granularity], range_start, range_end)
+        with profiler.stage("downsample", len(trend_df)):
+            trend_df = downsample(trend_df.rename(columns={"date": order_date_col, "sales": sales_col}),
+                                  order_date_col, sales_col)
+        fig1 = px.line(trend_df, x=order_date_col, y=sales_col, title=f"{TREND_TITLES[granularity]} Sales Trend")
         st.plotly_chart(fig1, use_container_width=True)
 
-        if product_col in df.columns:
+        if product_sales is not None:
+            compare = st.multiselect("Compare product trends", product_sales.nlargest(50).index.tolist())
+            if compare:
+                with profiler.stage("rollup_series"):
+                    product_trend = cube.series(GRANULARITIES[granularity], range_start, range_end,
+                                                products=compare)
+                product_trend = pd.concat(
+                    [downsample(g, "date", "sales", MAX_PLOT_POINTS // len(compare))
+                     for _, g in product_trend.groupby("product", sort=False)])
+                fig_cmp = px.line(product_trend.rename(columns={"product": product_col, "date": order_date_col,
+                                                                "sales": sales_col}),
+                                  x=order_date_col, y=sales_col, color=product_col, title="Product Sales Trend")
+                st.plotly_chart(fig_cmp, use_container_width=True)
+
             st.subheader("🏆 Top 10 Products by Sales")
-            top_products = df.groupby(product_col)[sales_col].sum().nlargest(10).reset_index()
+            with profiler.stage("top_products"):
+                top_products = (cube.top_products(10, range_start, range_end)
+                                .rename_axis(product_col).rename(sales_col).reset_index())
             fig2 = px.bar(top_products, x=sales_col, y=product_col, orientation='h', title="Top Products")
             st.plotly_chart(fig2, use_container_width=True)
 
         st.subheader("🔮 Sales Forecast (Next 6 Months)")
+        forecast_engine = st.sidebar.selectbox("Forecast engine", list(ENGINES), format_func=ENGINES.get)
+        forecast_cache = get_forecast_cache()
         try:
-            prophet_df = monthly_sales.rename(columns={order_date_col: "ds", sales_col: "y"}).dropna()
+            prophet_df = forecast_history(dataset)
             if prophet_df.shape[0] < 2:
                 st.warning("⚠️ Not enough data to build a forecast.")
             else:
-                model = Prophet()
-                model.fit(prophet_df)
-                future = model.make_future_dataframe(periods=6, freq='M')
-                forecast = model.predict(future)
+                with profiler.stage(f"forecast_{forecast_engine}", len(prophet_df)):
+                    forecast = run_forecast(prophet_df, periods=6, engine=forecast_engine, cache=forecast_cache)
                 fig3 = px.line(forecast, x='ds', y='yhat', title="Forecasted Sales")
                 st.plotly_chart(fig3, use_container_width=True)
 
@@ -102,84 +213,159 @@ if uploaded_file:
                     .rename(columns={'ds': 'Date', 'yhat': 'Forecasted Sales'})
                     .round(2)
                 )
+
+                if product_sales is not None and st.checkbox("📦 Forecast top products"):
+                    n_products = st.slider("Number of products", 2, 20, 5)
+                    per_product = cube.series("M", products=product_sales.nlargest(n_products).index.tolist())
+                    histories = {
+                        name: g.rename(columns={"date": "ds", "sales": "y"})[["ds", "y"]].reset_index(drop=True)
+                        for name, g in per_product.groupby("product", sort=False)
+                    }
+                    with profiler.stage("forecast_products", len(histories)):
+                        product_forecasts = forecast_many(histories, periods=6, engine=forecast_engine,
+                                                          cache=forecast_cache)
+                    if not product_forecasts:
+                        st.info("Not enough monthly history to forecast individual products.")
+                    else:
+                        combined = pd.concat(
+                            [fc[['ds', 'yhat']].assign(**{product_col: name})
+                             for name, fc in product_forecasts.items()],
+                            ignore_index=True)
+                        fig_products = px.line(combined, x='ds', y='yhat', color=product_col,
+                                               title="Forecasted Sales by Product")
+                        st.plotly_chart(fig_products, use_container_width=True)
+
+                if st.checkbox("🧪 Compare forecast engines (backtest)"):
+                    with profiler.stage("backtest", len(prophet_df)):
+                        scores = backtest(prophet_df, holdout=min(6, max(1, len(prophet_df) // 4)),
+                                          cache=forecast_cache)
+                    if scores.empty:
+                        st.info("Not enough history to backtest.")
+                    else:
+                        for failed in scores[scores["error"].notna()].itertuples():
+                            st.warning(f"{ENGINES[failed.engine]} backtest failed: {failed.error}")
+                        st.dataframe(scores[scores["error"].isna()].drop(columns="error").rename(columns={
+                            "engine": "Engine", "fit_seconds": "Fit time (s)",
+                            "mae": "MAE", "mape": "MAPE (%)"}).round(3))
         except Exception as e:
             st.error(f"❌ Forecasting failed: {e}")
 
         st.subheader("📋 Business Summary")
-        latest_month = monthly_sales[order_date_col].max()
+        summary = business_summary(dataset)
+        latest_month = summary["latest_month"]
         latest_month_str = latest_month.strftime('%B %Y') if pd.notnull(latest_month) else "Unknown"
-        last_sales = monthly_sales[sales_col].iloc[-1]
-        prev_sales = monthly_sales[sales_col].iloc[-2] if len(monthly_sales) > 1 else None
 
-        if prev_sales:
-            diff = last_sales - prev_sales
-            perc = (diff / prev_sales) * 100 if prev_sales != 0 else 0
-            trend = "up 📈" if diff > 0 else "down 📉"
-            st.markdown(f"**Last month’s sales ({latest_month_str})** were **${last_sales:,.2f}**, {trend} by **{abs(perc):.1f}%** from previous month.")
+        if summary["prev_sales"]:
+            trend = "up 📈" if summary["change_pct"] > 0 else "down 📉"
+            st.markdown(f"**Last month’s sales ({latest_month_str})** were **${summary['last_sales']:,.2f}**, {trend} by **{abs(summary['change_pct']):.1f}%** from previous month.")
 
         # =============================
         # 📈 Product Growth Advisor
         # =============================
         st.header("📈 Product Growth Advisor")
         top_n = 3
-        top_products = df.groupby(product_col)[sales_col].sum().nlargest(top_n).reset_index()
-
-        pytrends = TrendReq(hl='en-US', tz=360)
-        newsapi = NewsApiClient(api_key="8b3e20485b4943d190d06f67eee4df6b")  # Replace with your API key
-
-        for i, row in top_products.iterrows():
-            product = row[product_col]
-            product_sales = row[sales_col]
-
-            st.subheader(f"🧪 Product: **{product}**")
-            st.markdown(f"- 💰 **Current Sales:** ${product_sales:,.2f}")
+        advice = growth_advice(dataset, top_n, fetcher=get_signal_fetcher(),
+                               sentiment_engine=get_sentiment_engine(), profiler=profiler)
 
-            try:
-                pytrends.build_payload([product], cat=0, timeframe='today 3-m', geo='', gprop='')
-                trend_df = pytrends.interest_over_time()
-                trend_score = trend_df[product].mean() if not trend_df.empty else 0
-                trend_change = trend_df[product].pct_change().mean() * 100 if not trend_df.empty else 0
+        for item in advice:
+            st.subheader(f"🧪 Product: **{item['product']}**")
+            st.markdown(f"- 💰 **Current Sales:** ${item['sales']:,.2f}")
 
-                st.markdown(f"- 🌍 **Google Trend:** Avg Score: {trend_score:.1f}, Change: {trend_change:+.1f}%")
-
-                related = pytrends.related_queries()
-                related_top = related.get(product, {}).get('top')
-                if related_top is not None and not related_top.empty:
-                    top_keywords = ', '.join(related_top['query'].head(3))
-                    st.markdown(f"- 🔁 **Related Searches:** {top_keywords}")
+            if item["trend_error"]:
+                st.warning(f"Google Trends failed: {item['trend_error']}")
+            else:
+                st.markdown(f"- 🌍 **Google Trend:** Avg Score: {item['trend_score']:.1f}, Change: {item['trend_change']:+.1f}%")
+                if item["related"]:
+                    st.markdown(f"- 🔁 **Related Searches:** {', '.join(item['related'])}")
                 else:
                     st.markdown("- 🔁 **Related Searches:** Not found")
 
-            except Exception as e:
-                st.warning(f"Google Trends failed: {e}")
-
-            try:
-                news = newsapi.get_everything(q=product, language='en', sort_by='relevancy', page_size=5)
-                if news['articles']:
-                    headlines = [article['title'] for article in news['articles']]
-                    sentiments = [TextBlob(title).sentiment.polarity for title in headlines]
-                    avg_sentiment = sum(sentiments) / len(sentiments)
-                    sentiment_label = 'Positive ✅' if avg_sentiment > 0 else 'Negative ❌' if avg_sentiment < 0 else 'Neutral ⚪'
-                    st.markdown(f"- 📰 **News Sentiment:** {sentiment_label} ({avg_sentiment:.2f})")
-                else:
-                    avg_sentiment = 0
-                    st.markdown("- 📰 **News Sentiment:** No recent news found")
-
-            except Exception as e:
-                avg_sentiment = 0
-                st.warning(f"News API failed: {e}")
-
-            if trend_change > 10 and avg_sentiment > 0:
-                suggestion = f"📢 Consider launching a **promotion or ad campaign** — interest is growing and sentiment is positive!"
-            elif trend_change < -10:
-                suggestion = f"📉 Trend is declining. Consider repositioning or bundling this product with a high-performer."
-            elif avg_sentiment < 0:
-                suggestion = f"⚠️ Reviews/news are negative. Investigate customer concerns and improve perception."
+            if item["news_error"]:
+                st.warning(f"News API failed: {item['news_error']}")
+            elif item["headlines"]:
+                st.markdown(f"- 📰 **News Sentiment:** {item['sentiment_label']} ({item['avg_sentiment']:.2f})")
             else:
-                suggestion = f"📊 Stable trend — explore content marketing using keywords like **{top_keywords if 'top_keywords' in locals() else product}**."
+                st.markdown("- 📰 **News Sentiment:** No recent news found")
 
-            st.success(f"🧠 Suggestion: {suggestion}")
+            st.success(f"🧠 Suggestion: {item['suggestion']}")
             st.markdown("---")
 
     except Exception as e:
         st.error(f"Failed to read business file: {e}")
+
+# =============================
+# CUSTOMER REVIEWS & SENTIMENT
+# =============================
+st.header("💬 Customer Reviews")
+
+review_file = st.file_uploader("Upload customer reviews (CSV, Parquet or Arrow)",
+                               type=["csv", "parquet", "arrow", "feather"], key="reviews")
+if review_file:
+    try:
+        review_bytes = review_file.getvalue()
+        review_format = detect_format(review_file.name)
+        with profiler.stage("read_review_sample"):
+            review_sample = read_sample(io.BytesIO(review_bytes), review_format)
+
+        review_cols = detect_review_columns(review_sample)
+        text_col = review_cols["text"] or st.selectbox("Select Review Text Column", review_sample.columns)
+        review_product_col = review_cols["product"]
+
+        pipeline_cache = get_pipeline_cache()
+        review_key = make_cache_key(review_bytes, {
+            "kind": "reviews", "format": review_format,
+            "text": text_col, "product": review_product_col,
+        })
+        cached = pipeline_cache.get(review_key)
+        if cached is not None:
+            _, review_result = cached
+        else:
+            with st.spinner("Scoring reviews..."), profiler.stage("analyze_reviews") as review_stage:
+                review_result = analyze_reviews(io.BytesIO(review_bytes), review_format, text_col,
+                                                review_product_col, engine=get_sentiment_engine())
+                review_stage.rows += review_result["rows"]
+            pipeline_cache.put(review_key, review_sample.head(10), review_result)
+
+        breakdown = review_result["breakdown"]
+        st.success(f"✅ Scored {review_result['rows']:,} reviews")
+
+        st.subheader("📊 Sentiment Breakdown")
+        totals = breakdown[LABELS].sum().rename_axis("Sentiment").reset_index(name="Reviews")
+        fig_sent = px.pie(totals, names="Sentiment", values="Reviews", title="Overall Sentiment",
+                          color="Sentiment",
+                          color_discrete_map={"Positive": "green", "Neutral": "gray", "Negative": "red"})
+        st.plotly_chart(fig_sent, use_container_width=True)
+        if review_product_col:
+            st.dataframe(breakdown.round(3))
+
+        if review_result["words"]:
+            from wordcloud import WordCloud
+            import matplotlib.pyplot as plt
+
+            st.subheader("☁️ What Customers Talk About")
+            wordcloud = WordCloud(width=800, height=400, background_color="white")
+            wordcloud.generate_from_frequencies(review_result["words"])
+            fig_wc, ax = plt.subplots(figsize=(10, 5))
+            ax.imshow(wordcloud, interpolation="bilinear")
+            ax.axis("off")
+            st.pyplot(fig_wc)
+
+    except Exception as e:
+        st.error(f"Failed to analyze reviews: {e}")
+
+# =============================
+# PERFORMANCE
+# =============================
+if show_performance:
+    st.header("⏱️ Performance")
+    stages = pd.DataFrame(profiler.report())
+    if stages.empty:
+        st.info("Nothing was timed on this run. Upload a file to profile the pipeline.")
+    else:
+        st.caption(f"Total {stages['seconds'].sum():.2f}s over {len(stages)} stages on this run. "
+                   "Chunked stages are summed; throughput is rows per second.")
+        st.dataframe(stages.rename(columns={
+            "stage": "Stage", "calls": "Calls", "seconds": "Seconds", "rows": "Rows",
+            "rows_per_second": "Rows/s", "peak_rss_mb": "Peak RSS (MB)", "rss_delta_mb": "RSS Δ (MB)"}))
+        st.download_button("📥 Download timings (JSON)", profiler.to_json(), file_name="bizinsight_timings.json",
+                           mime="application/json")
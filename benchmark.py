@@ -0,0 +1,235 @@
+"""Pipeline benchmarks on synthetic sales data: ``python benchmark.py``.
+
+Generates messy sales exports (mixed currency formatting, refunds in
+parentheses, a share of dates in a second format, blanks and junk) at each
+requested size and runs the dashboard pipeline on them: chunked load, rollup
+queries, forecasts and the Growth Advisor with the market APIs stubbed by the
+``Fake*`` providers. Each size runs in a fresh process so peak RSS isn't
+inherited from the previous one. Results are written as JSON. Pass
+``--baseline`` with an earlier results file to fail on regressions.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROWS = [100_000, 1_000_000, 10_000_000]
+GENERATE_CHUNK = 500_000
+# Stages faster than this are too noisy to compare against a baseline
+MIN_COMPARE_SECONDS = 0.05
+
+
+# =============================
+# Synthetic data
+# =============================
+def generate_sales(path, rows, products=200, start="2021-01-01", days=3 * 365, messy=0.1, seed=0):
+    """Write a sales CSV of ``rows`` orders over ``days`` days and ``products``
+    products. ``messy`` is the share of rows with off-format dates or sales."""
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range(start, periods=days, freq="D")
+    us_dates = np.asarray(calendar.strftime("%m/%d/%Y"), dtype=object)
+    iso_dates = np.asarray(calendar.strftime("%Y-%m-%d"), dtype=object)
+    names = np.array([f"Product {i:04d}" for i in range(products)], dtype=object)
+    popularity = rng.zipf(1.6, products).astype("float64")
+    popularity /= popularity.sum()
+    price = rng.lognormal(3.5, 0.8, products)
+
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        while written < rows:
+            n = min(GENERATE_CHUNK, rows - written)
+            day = np.sort(rng.integers(0, days, n))
+            product = rng.choice(products, n, p=popularity)
+            quantity = rng.integers(1, 6, n)
+            sales = np.round(price[product] * quantity * rng.uniform(0.8, 1.2, n), 2)
+
+            order_date = us_dates[day]
+            odd = rng.random(n) < messy / 2
+            order_date[odd] = iso_dates[day[odd]]
+            order_date[rng.random(n) < messy / 50] = ""
+
+            refund = rng.random(n) < messy / 5
+            sales[refund] = -sales[refund]
+            text = np.char.mod("%.2f", np.abs(sales)).astype(object)
+            dollar = rng.random(n) < 0.5
+            text[dollar] = "$" + text[dollar]
+            big = (np.abs(sales) >= 1000) & (rng.random(n) < messy * 5)
+            text[big] = ["${:,.2f}".format(v) for v in np.abs(sales[big])]
+            text[refund] = "(" + text[refund] + ")"
+            junk = rng.random(n) < messy / 20
+            text[junk] = rng.choice(["", "N/A", "-", "TBD"], int(junk.sum()))
+
+            pd.DataFrame({
+                "Order ID": np.arange(written, written + n),
+                "Order Date": order_date,
+                "Product Name": names[product],
+                "Quantity": quantity,
+                "Sales": text,
+            }).to_csv(f, index=False, header=written == 0)
+            written += n
+    return path
+
+
+# =============================
+# Benchmark run
+# =============================
+def run_size(rows, data_dir, products=200, days=3 * 365, messy=0.1, engines=("ets", "seasonal_naive"),
+             latency=0.05, store=False, seed=0):
+    """Generate one dataset and profile the pipeline on it; returns a results dict."""
+    from core import business_summary, forecast_history, growth_advice, load_dataset
+    from forecasting import forecast, forecast_many
+    from market_signals import FakeNewsProvider, FakeTrendsProvider, MarketSignalFetcher
+    from profiling import StageProfiler, peak_rss_bytes, to_mb
+    from rollup import downsample
+    from sentiment import SentimentEngine
+
+    path = os.path.join(data_dir, f"sales_{rows}.csv")
+    start = time.perf_counter()
+    generate_sales(path, rows, products=products, days=days, messy=messy, seed=seed)
+    generate_seconds = time.perf_counter() - start
+
+    profiler = StageProfiler()
+    with profiler.stage("load_dataset", rows):
+        dataset = load_dataset(path, profiler=profiler)
+    cube = dataset.rollup
+
+    for granularity in ("D", "W", "M"):
+        with profiler.stage(f"rollup_series_{granularity}"):
+            series = cube.series(granularity)
+    with profiler.stage("rollup_products"):
+        top = cube.top_products(20)
+        cube.series("W", products=top.index.tolist())
+    with profiler.stage("downsample"):
+        downsample(cube.series("D"), "date", "sales", 500)
+    with profiler.stage("business_summary"):
+        business_summary(dataset)
+
+    history = forecast_history(dataset)
+    for engine in engines:
+        with profiler.stage(f"forecast_{engine}", len(history)):
+            forecast(history, periods=6, engine=engine)
+    per_product = cube.series("M", products=top.index.tolist())
+    histories = {name: g.rename(columns={"date": "ds", "sales": "y"})[["ds", "y"]].reset_index(drop=True)
+                 for name, g in per_product.groupby("product", sort=False)}
+    with profiler.stage("forecast_products", len(histories)):
+        forecast_many(histories, periods=6, engine=engines[0])
+
+    signal_dir = tempfile.mkdtemp(prefix="signals-", dir=data_dir)
+    fetcher = MarketSignalFetcher(FakeTrendsProvider(latency=latency), FakeNewsProvider(latency=latency),
+                                  cache_dir=signal_dir, backoff=0.0)
+    with profiler.stage("growth_advice_cold"):
+        growth_advice(dataset, 10, fetcher=fetcher, sentiment_engine=SentimentEngine(),
+                      profiler=profiler)
+    with profiler.stage("growth_advice_warm"):
+        growth_advice(dataset, 10, fetcher=fetcher, sentiment_engine=SentimentEngine())
+
+    if store:
+        from dataset_store import DatasetStore
+
+        dataset_store = DatasetStore(os.path.join(data_dir, f"store_{rows}"))
+        with profiler.stage("store_append", rows):
+            dataset_store.append(path)
+        with profiler.stage("store_load"):
+            dataset_store.dataset()
+
+    return {
+        "rows": rows,
+        "rows_kept": dataset.rows_kept,
+        "file_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+        "generate_seconds": round(generate_seconds, 3),
+        "months": len(series),
+        "process_peak_rss_mb": to_mb(peak_rss_bytes()),
+        "stages": profiler.report(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Stages slower, or with a higher peak RSS, than ``baseline`` by more than ``tolerance``."""
+    before = {(run["rows"], s["stage"]): s for run in baseline["runs"] for s in run["stages"]}
+    regressions = []
+    for run in results["runs"]:
+        for s in run["stages"]:
+            old = before.get((run["rows"], s["stage"]))
+            if old is None:
+                continue
+            if old["seconds"] >= MIN_COMPARE_SECONDS and s["seconds"] > old["seconds"] * (1 + tolerance):
+                regressions.append(f"{run['rows']:,} rows / {s['stage']}: "
+                                   f"{old['seconds']:.3f}s -> {s['seconds']:.3f}s")
+            if None in (s["peak_rss_mb"], old["peak_rss_mb"]):
+                continue
+            if s["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+                regressions.append(f"{run['rows']:,} rows / {s['stage']}: "
+                                   f"peak RSS {old['peak_rss_mb']} MB -> {s['peak_rss_mb']} MB")
+    return regressions
+
+
+def print_run(run):
+    print(f"\n{run['rows']:,} rows ({run['file_mb']} MB CSV, generated in {run['generate_seconds']}s, "
+          f"process peak {run['process_peak_rss_mb']} MB)")
+    print(f"  {'stage':<24}{'calls':>6}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+    for s in run["stages"]:
+        rate = f"{s['rows_per_second']:,.0f}" if s["rows_per_second"] else "-"
+        peak = f"{s['peak_rss_mb']:.1f}" if s["peak_rss_mb"] is not None else "-"
+        print(f"  {s['stage']:<24}{s['calls']:>6}{s['seconds']:>10.3f}{rate:>14}{peak:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the BizInsight pipeline on synthetic sales data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="Dataset sizes to run (default: 100000 1000000 10000000)")
+    parser.add_argument("--products", type=int, default=200, help="Distinct products (default: 200)")
+    parser.add_argument("--days", type=int, default=3 * 365, help="Date span in days (default: 1095)")
+    parser.add_argument("--messy", type=float, default=0.1,
+                        help="Share of rows with off-format dates or sales (default: 0.1)")
+    parser.add_argument("--engines", nargs="+", default=["ets", "seasonal_naive"],
+                        help="Forecast engines to time (default: ets seasonal_naive)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Simulated market API round-trip in seconds (default: 0.05)")
+    parser.add_argument("--store", action="store_true", help="Also time appending to a local dataset store")
+    parser.add_argument("--data-dir", default=None, help="Where to write generated files (default: temp dir)")
+    parser.add_argument("--out", default="benchmark_results.json", help="Results file")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown / memory growth vs. the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="bizinsight-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+    results = {"started": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpus": os.cpu_count(),
+               "pandas": pd.__version__, "numpy": np.__version__, "runs": []}
+    try:
+        for rows in args.rows:
+            # A fresh worker per size keeps peak RSS and warm caches from leaking between runs
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                run = pool.submit(run_size, rows, data_dir, args.products, args.days, args.messy,
+                                  tuple(args.engines), args.latency, args.store).result()
+            results["runs"].append(run)
+            print_run(run)
+    finally:
+        if args.data_dir is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
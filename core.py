@@ -0,0 +1,198 @@
+"""UI-free core: ingest → aggregate → forecast → growth advice.
+
+Everything the dashboard shows can be produced from here without Streamlit,
+which is how ``report.py`` builds nightly reports. Heavy dependencies
+(Prophet, pytrends, NewsAPI, TextBlob) are only imported by the step that
+actually needs them.
+"""
+import os
+
+from ingest import CHUNK_ROWS, clean_chunk, detect_columns, detect_format, read_sample, stream_aggregate
+from profiling import stage
+from rollup import RollupBuilder
+
+
+class Dataset:
+    """Cleaned aggregates of one sales upload; the raw rows are never kept."""
+
+    def __init__(self, columns, preview, monthly_sales, product_sales, rollup,
+                 cleaning_report, rows_read, rows_kept):
+        self.columns = columns
+        self.preview = preview
+        self.monthly_sales = monthly_sales
+        self.product_sales = product_sales
+        self.rollup = rollup
+        self.cleaning_report = cleaning_report
+        self.rows_read = rows_read
+        self.rows_kept = rows_kept
+
+    @property
+    def date_col(self):
+        return self.columns["date"]
+
+    @property
+    def sales_col(self):
+        return self.columns["sales"]
+
+    @property
+    def product_col(self):
+        return self.columns["product"]
+
+    @property
+    def nbytes(self):
+        frames = [self.preview, self.monthly_sales]
+        if self.product_sales is not None:
+            frames.append(self.product_sales)
+        size = sum(int(f.memory_usage(deep=True).sum()) if hasattr(f, "columns")
+                   else int(f.memory_usage(deep=True)) for f in frames)
+        return size + self.rollup.nbytes
+
+
+def resolve_columns(sample, date_col=None, sales_col=None, product_col=None):
+    """Auto-detect the key columns, letting explicit names override detection."""
+    detected = detect_columns(sample)
+    return {
+        "date": date_col or detected["date"],
+        "sales": sales_col or detected["sales"],
+        "product": product_col or detected["product"],
+    }
+
+
+def load_dataset(source, fmt=None, date_col=None, sales_col=None, product_col=None,
+                 sample=None, chunksize=CHUNK_ROWS, profiler=None):
+    """Stream ``source`` (a path or binary file object) into a ``Dataset``.
+
+    Raises ``ValueError`` when a key column can't be found or no rows survive
+    cleaning.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        fmt = fmt or detect_format(os.fspath(source))
+        with open(source, "rb") as f:
+            return load_dataset(f, fmt, date_col, sales_col, product_col, sample, chunksize, profiler)
+    fmt = fmt or "csv"
+
+    if sample is None:
+        with stage(profiler, "read_sample"):
+            sample = read_sample(source, fmt)
+    with stage(profiler, "match_columns"):
+        columns = resolve_columns(sample, date_col, sales_col, product_col)
+    for role in ("date", "sales"):
+        if not columns[role]:
+            raise ValueError(f"Could not detect a {role} column.")
+
+    rollup = RollupBuilder(columns["date"], columns["sales"], columns["product"])
+    agg = stream_aggregate(source, fmt, columns["date"], columns["sales"], columns["product"],
+                           chunksize=chunksize, sample=sample, sinks=[rollup], profiler=profiler)
+    if agg.sales_parsed == 0:
+        raise ValueError("Sales column could not be converted to numbers. Please check your file format.")
+    if agg.rows_kept == 0:
+        raise ValueError("No valid rows after cleaning. Please check your data.")
+
+    preview = clean_chunk(sample.copy(), columns["date"], columns["sales"], columns["product"])
+    preview = preview.dropna(subset=[columns["date"], columns["sales"]]).head(10)
+    with stage(profiler, "finalize"):
+        monthly_sales, product_sales = agg.monthly_sales(), agg.product_sales()
+        cube = rollup.build()
+    return Dataset(
+        columns=columns,
+        preview=preview,
+        monthly_sales=monthly_sales,
+        product_sales=product_sales,
+        rollup=cube,
+        cleaning_report=agg.cleaning_report(),
+        rows_read=agg.rows_read,
+        rows_kept=agg.rows_kept,
+    )
+
+
+def forecast_history(dataset):
+    return dataset.monthly_sales.rename(columns={dataset.date_col: "ds", dataset.sales_col: "y"}).dropna()
+
+
+def forecast_sales(dataset, periods=6, engine="prophet", cache=None, profiler=None):
+    """Forecast total monthly sales; ``None`` when there are fewer than two months."""
+    from forecasting import forecast
+
+    history = forecast_history(dataset)
+    if history.shape[0] < 2:
+        return None
+    with stage(profiler, f"forecast_{engine}", len(history)):
+        return forecast(history, periods=periods, engine=engine, cache=cache)
+
+
+def business_summary(dataset):
+    """Last month's sales and the change from the month before."""
+    monthly = dataset.monthly_sales
+    latest_month = monthly[dataset.date_col].max()
+    last_sales = float(monthly[dataset.sales_col].iloc[-1])
+    prev_sales = float(monthly[dataset.sales_col].iloc[-2]) if len(monthly) > 1 else None
+    change_pct = None
+    if prev_sales:
+        change_pct = (last_sales - prev_sales) / prev_sales * 100
+    return {
+        "latest_month": latest_month,
+        "last_sales": last_sales,
+        "prev_sales": prev_sales,
+        "change_pct": change_pct,
+    }
+
+
+def sentiment_label(avg_sentiment):
+    return 'Positive ✅' if avg_sentiment > 0 else 'Negative ❌' if avg_sentiment < 0 else 'Neutral ⚪'
+
+
+def suggest(trend_change, avg_sentiment, keywords):
+    if trend_change > 10 and avg_sentiment > 0:
+        return "📢 Consider launching a **promotion or ad campaign** — interest is growing and sentiment is positive!"
+    if trend_change < -10:
+        return "📉 Trend is declining. Consider repositioning or bundling this product with a high-performer."
+    if avg_sentiment < 0:
+        return "⚠️ Reviews/news are negative. Investigate customer concerns and improve perception."
+    return f"📊 Stable trend — explore content marketing using keywords like **{keywords}**."
+
+
+def default_fetcher(api_key=None, offline=False, cache_dir=None):
+    """Market-signal fetcher on the real APIs, or on local fakes when ``offline``."""
+    from market_signals import (FakeNewsProvider, FakeTrendsProvider, GoogleTrendsProvider,
+                                MarketSignalFetcher, NewsApiProvider)
+
+    if offline:
+        return MarketSignalFetcher(FakeTrendsProvider(), FakeNewsProvider(), cache_dir=cache_dir)
+    news = NewsApiProvider(api_key=api_key) if api_key else None
+    return MarketSignalFetcher(GoogleTrendsProvider(hl='en-US', tz=360), news, cache_dir=cache_dir)
+
+
+def growth_advice(dataset, top_n=3, fetcher=None, sentiment_engine=None, profiler=None):
+    """Trend, news sentiment and a suggestion for each of the top products."""
+    if dataset.product_sales is None:
+        return []
+    if fetcher is None:
+        fetcher = default_fetcher()
+    if sentiment_engine is None:
+        from sentiment import SentimentEngine
+
+        sentiment_engine = SentimentEngine()
+
+    top = dataset.product_sales.nlargest(top_n)
+    with stage(profiler, "market_signals", len(top)):
+        signals = fetcher.fetch(top.index.tolist())
+    # Score every headline in one batch instead of per product
+    all_headlines = [h for signal in signals.values() for h in signal["headlines"]]
+    with stage(profiler, "headline_sentiment", len(all_headlines)):
+        headline_scores = dict(zip(all_headlines, sentiment_engine.score(all_headlines)))
+
+    advice = []
+    for product, sales in top.items():
+        signal = signals[str(product)]
+        scores = [headline_scores[h] for h in signal["headlines"]]
+        avg_sentiment = float(sum(scores) / len(scores)) if scores and not signal["news_error"] else 0.0
+        keywords = ', '.join(signal["related"]) or product
+        advice.append({
+            "product": product,
+            "sales": float(sales),
+            **signal,
+            "avg_sentiment": avg_sentiment,
+            "sentiment_label": sentiment_label(avg_sentiment),
+            "suggestion": suggest(signal["trend_change"], avg_sentiment, keywords),
+        })
+    return advice
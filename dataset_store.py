@@ -0,0 +1,315 @@
+"""Persistent, append-only local store for sales history.
+
+Cleaned rows live in one Parquet file per month under ``partitions/``, next
+to a day × product rollup table (``daily.parquet``) and a JSON manifest with
+per-month totals. A new upload is appended as a delta: rows whose key is
+already stored are skipped, and only the months the delta touches are
+rewritten and re-aggregated. The dashboard is then rebuilt from the manifest
+and rollup table without rereading the full history.
+
+Rows are keyed by their content (the order ID plus the cleaned date, product
+and sales, or the whole raw row when there is no order ID column) and by how
+many identical rows came before them in the same upload. Repeated identical
+rows inside one upload are all kept; re-uploading an overlapping export only
+skips the copies that are already stored.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from core import Dataset, resolve_columns
+from ingest import CHUNK_ROWS, build_normalizers, detect_format, iter_chunks, monthly_frame, read_sample
+from rollup import ALL_PRODUCTS, NO_PRODUCT, RollupCube
+
+ORDER_ID_NAMES = ["Order ID", "Order No", "Order Number", "Invoice", "Invoice ID", "Invoice No",
+                  "Invoice Number", "Transaction ID"]
+KEY_COL = "_row_key"
+CONTENT_COL = "_row_content"
+MANIFEST_VERSION = 1
+
+
+def _header_key(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def match_order_column(columns, exclude=()):
+    """Order ID column by exact (case/punctuation-insensitive) header name.
+
+    No fuzzy matching here: "Order Date" is one edit away from "Order ID",
+    and keying on the wrong column merges real orders.
+    """
+    wanted = {_header_key(n) for n in ORDER_ID_NAMES}
+    for col in columns:
+        if col not in exclude and _header_key(col) in wanted:
+            return col
+    return None
+
+
+def _hash(values):
+    return pd.util.hash_pandas_object(pd.Series(values), index=False, categorize=False).to_numpy()
+
+
+# Floats past 2**53 aren't exact, so larger numbers are keyed by their text
+_EXACT_FLOAT = 2 ** 53
+_BLANK_HASH = _hash([""])[0]
+_NUMBER_START = list("0123456789+-. ")
+
+
+def _parse_numbers(text):
+    """Float value of each string, NaN where it isn't a plain number."""
+    try:
+        return text.astype("float64")
+    except ValueError:
+        pass
+    # Mixed column: only values that start like a number can parse as one
+    numbers = pd.Series(np.nan, index=text.index)
+    maybe = text.str[:1].isin(_NUMBER_START).to_numpy()
+    try:
+        numbers[maybe] = text[maybe].astype("float64")
+    except ValueError:
+        numbers[maybe] = pd.to_numeric(text[maybe], errors="coerce")
+    return numbers
+
+
+def _key_hash(values):
+    """Hash one column for row keys without depending on the dtype a chunk was
+    read with: ``10``, ``10.0`` and ``"10.0"`` hash alike (a blank turns an int
+    column into floats), and so do NaN, ``None`` and ``""``."""
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_float_dtype(values):
+        numbers = values.astype("float64")
+        hashes = _hash(numbers)
+        hashes[numbers.isna().to_numpy()] = _BLANK_HASH
+        inexact = (numbers.abs() >= _EXACT_FLOAT).to_numpy()
+        if inexact.any():
+            hashes[inexact] = _hash(values[inexact].astype(str))
+        return hashes
+
+    # Text (or mixed) column: parse each distinct value once
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    numbers = _parse_numbers(text)
+    numeric = (numbers.abs() < _EXACT_FLOAT).to_numpy()
+    hashes = np.empty(len(text), dtype="uint64")
+    hashes[numeric] = _hash(numbers[numeric])
+    hashes[~numeric] = _hash(text[~numeric])
+    # Missing values get code -1, which picks the appended blank hash
+    return np.append(hashes, _BLANK_HASH)[codes]
+
+
+def _row_keys(content):
+    """Key each row by its content hash and its occurrence number among
+    identical rows, so repeats within an upload stay distinct."""
+    occurrence = content.groupby(content).cumcount()
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({"content": content.to_numpy(), "occurrence": occurrence.to_numpy()}), index=False
+    ).to_numpy()
+
+
+def _write_parquet(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+class DatasetStore:
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.partition_dir = os.path.join(root, "partitions")
+        self.daily_path = os.path.join(root, "daily.parquet")
+        self.manifest = self._load_manifest()
+        self._dataset = None
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "revision": 0, "columns": None, "order_col": None,
+                    "partitions": {}, "uploads": [], "rows_read": 0, "rows_kept": 0,
+                    "cleaning_report": {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    @property
+    def empty(self):
+        return not self.manifest["partitions"]
+
+    @property
+    def columns(self):
+        return self.manifest["columns"]
+
+    def has_upload(self, digest):
+        return digest in self.manifest["uploads"]
+
+    def _partition_path(self, month):
+        return os.path.join(self.partition_dir, f"month={month}.parquet")
+
+    def _read_partition(self, month):
+        path = self._partition_path(month)
+        return pd.read_parquet(path) if os.path.exists(path) else None
+
+    def append(self, source, fmt=None, date_col=None, sales_col=None, product_col=None,
+               digest=None, chunksize=CHUNK_ROWS):
+        """Append an upload (path or binary file object) and return counts of
+        rows read, added and skipped as duplicates, plus the months touched."""
+        if isinstance(source, (str, os.PathLike)):
+            fmt = fmt or detect_format(os.fspath(source))
+            with open(source, "rb") as f:
+                return self.append(f, fmt, date_col, sales_col, product_col, digest, chunksize)
+        fmt = fmt or "csv"
+
+        sample = read_sample(source, fmt)
+        stored = self.columns or {}
+        columns = resolve_columns(sample, date_col or stored.get("date"), sales_col or stored.get("sales"),
+                                  product_col or stored.get("product"))
+        for role in ("date", "sales"):
+            if not columns[role] or columns[role] not in sample.columns:
+                raise ValueError(f"Could not find the {role} column in this upload.")
+        if self.columns and columns != self.columns:
+            raise ValueError(f"Upload columns {columns} don't match the stored history {self.columns}.")
+        date, sales, product = columns["date"], columns["sales"], columns["product"]
+        order_col = self.manifest["order_col"] or match_order_column(sample.columns, (date, sales, product))
+        if order_col and order_col not in sample.columns:
+            raise ValueError(f"Upload is missing the order ID column '{order_col}' used by the stored history.")
+        dates, money = build_normalizers(sample, date, sales)
+
+        os.makedirs(self.partition_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix="staging-", dir=self.root)
+        staged = defaultdict(list)
+        rows_read = rows_kept = 0
+        try:
+            # Stage each chunk's rows by month so memory stays bounded by one month
+            for n, chunk in enumerate(iter_chunks(source, fmt, chunksize=chunksize)):
+                rows_read += len(chunk)
+                products = ALL_PRODUCTS
+                if product:
+                    products = chunk[product].astype(object).where(chunk[product].notna(), NO_PRODUCT)
+                    products = products.astype(str).to_numpy()
+                rows = pd.DataFrame({
+                    "date": dates(chunk[date]).to_numpy(),
+                    "sales": money(chunk[sales]).to_numpy(),
+                    "product": products,
+                })
+                # Key on cleaned values when there's an order ID, so a re-export with
+                # different date/currency formatting still matches; otherwise on the raw
+                # row's text, written the same way whichever dtypes this chunk inferred.
+                if order_col:
+                    key_source = rows.assign(order=_key_hash(chunk[order_col]))
+                else:
+                    key_source = pd.DataFrame({i: _key_hash(chunk.iloc[:, i]) for i in range(chunk.shape[1])})
+                rows[CONTENT_COL] = pd.util.hash_pandas_object(key_source, index=False).to_numpy()
+                rows = rows.dropna(subset=["date", "sales"])
+                rows_kept += len(rows)
+                for month, part in rows.groupby(rows["date"].dt.to_period("M")):
+                    path = os.path.join(staging, f"{month}-{n}.parquet")
+                    part.to_parquet(path, index=False)
+                    staged[str(month)].append(path)
+
+            added = 0
+            touched = []
+            for month in sorted(staged):
+                # Staged parts are in file order, so occurrence numbers match
+                # between two exports of the same rows
+                incoming = pd.concat([pd.read_parquet(p) for p in staged[month]], ignore_index=True)
+                incoming[KEY_COL] = _row_keys(incoming.pop(CONTENT_COL))
+                existing = self._read_partition(month)
+                if existing is not None:
+                    incoming = incoming[~incoming[KEY_COL].isin(existing[KEY_COL])]
+                if incoming.empty:
+                    continue
+                merged = incoming if existing is None else pd.concat([existing, incoming], ignore_index=True)
+                merged = merged.sort_values("date", kind="stable")
+                _write_parquet(merged, self._partition_path(month))
+                self.manifest["partitions"][month] = {"rows": len(merged), "sales": float(merged["sales"].sum())}
+                added += len(incoming)
+                touched.append(month)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if touched:
+            self._refresh_daily(touched)
+
+        report = Counter(self.manifest["cleaning_report"])
+        report.update(dates.counts)
+        report.update(money.counts)
+        self.manifest.update(
+            columns=columns, order_col=order_col, cleaning_report=dict(report),
+            rows_read=self.manifest["rows_read"] + rows_read,
+            rows_kept=self.manifest["rows_kept"] + added,
+            revision=self.manifest["revision"] + 1,
+        )
+        if digest:
+            self.manifest["uploads"].append(digest)
+        self._save_manifest()
+        return {"rows_read": rows_read, "rows_added": added, "duplicates": rows_kept - added,
+                "months": touched}
+
+    def _refresh_daily(self, months):
+        """Recompute the day × product rollup rows of ``months`` only."""
+        if os.path.exists(self.daily_path):
+            daily = pd.read_parquet(self.daily_path)
+            daily = daily[~daily["day"].dt.to_period("M").astype(str).isin(months)]
+        else:
+            daily = None
+
+        fresh = []
+        for month in months:
+            part = self._read_partition(month)
+            fresh.append(part.groupby([part["date"].dt.floor("D").rename("day"), "product"])["sales"]
+                         .agg(["sum", "count"]).reset_index())
+        daily = pd.concat(([daily] if daily is not None else []) + fresh, ignore_index=True)
+        _write_parquet(daily.sort_values(["day", "product"], kind="stable"), self.daily_path)
+
+    def dataset(self):
+        """Warm-start a ``Dataset`` from the manifest and rollup table."""
+        if self.empty:
+            return None
+        if self._dataset is not None and self._dataset[0] == self.manifest["revision"]:
+            return self._dataset[1]
+
+        columns = self.columns
+        date, sales, product = columns["date"], columns["sales"], columns["product"]
+        totals = pd.Series({pd.Period(m, freq="M"): p["sales"] for m, p in self.manifest["partitions"].items()})
+        daily = pd.read_parquet(self.daily_path)
+        product_sales = None
+        if product:
+            named = daily[daily["product"] != NO_PRODUCT]
+            product_sales = named.groupby("product")["sum"].sum().rename(sales).rename_axis(product)
+
+        latest = max(self.manifest["partitions"])
+        preview = self._read_partition(latest).tail(10).drop(columns=KEY_COL)
+        preview = preview.rename(columns={"date": date, "sales": sales, "product": product or "product"})
+
+        ds = Dataset(
+            columns=columns,
+            preview=preview.reset_index(drop=True),
+            monthly_sales=monthly_frame(totals.sort_index(), date, sales),
+            product_sales=product_sales,
+            rollup=RollupCube.from_frame(daily),
+            cleaning_report=self.manifest["cleaning_report"],
+            rows_read=self.manifest["rows_read"],
+            rows_kept=self.manifest["rows_kept"],
+        )
+        self._dataset = (self.manifest["revision"], ds)
+        return ds
+
+    def info(self):
+        return {
+            "months": len(self.manifest["partitions"]),
+            "rows": sum(p["rows"] for p in self.manifest["partitions"].values()),
+            "uploads": len(self.manifest["uploads"]),
+            "updated": time.ctime(os.path.getmtime(self.manifest_path)) if os.path.exists(self.manifest_path) else None,
+        }
@@ -0,0 +1,314 @@
+"""Sales forecasting engines with a fitted-model cache.
+
+Fitted models are serialized and keyed by a hash of the input series plus the
+engine settings, so an unchanged series is never refit across reruns. Besides
+Prophet there are two NumPy baselines (Holt exponential smoothing and seasonal
+naive) that fit in milliseconds, and ``forecast_many`` fans a batch of product
+series out over a process pool.
+
+Every engine takes a monthly history frame with ``ds`` (month-end dates) and
+``y`` columns and returns a ``ds`` / ``yhat`` frame covering the history plus
+the forecast horizon, like ``Prophet.predict``.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ENGINES = {
+    "prophet": "Prophet",
+    "ets": "Exponential smoothing (fast)",
+    "seasonal_naive": "Seasonal naive (fast)",
+}
+SEASON = 12
+FREQ = "M"
+
+# Smoothing grid searched by the ETS engine, vectorized over all combinations
+ETS_ALPHAS = np.linspace(0.05, 0.95, 19)
+ETS_BETAS = np.linspace(0.0, 0.5, 11)
+
+
+def series_key(history, engine, settings=None):
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(history[["ds", "y"]], index=False).to_numpy().tobytes())
+    h.update(json.dumps({"engine": engine, "settings": settings or {}}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _future_dates(history, periods):
+    return pd.date_range(history["ds"].iloc[-1], periods=periods + 1, freq=FREQ)[1:]
+
+
+# =============================
+# Baseline engines
+# =============================
+def _ets_states(y, alpha, beta):
+    """Run Holt's linear recursion for every (alpha, beta) pair at once.
+
+    Returns one-step-ahead fitted values (n_params x len(y)), and the final
+    level and trend per pair.
+    """
+    level = np.full(alpha.shape, y[0], dtype="float64")
+    trend = np.full(alpha.shape, y[1] - y[0] if len(y) > 1 else 0.0)
+    fitted = np.empty((alpha.size, len(y)))
+    fitted[:, 0] = y[0]
+    for t in range(1, len(y)):
+        pred = level + trend
+        fitted[:, t] = pred
+        new_level = alpha * y[t] + (1 - alpha) * pred
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    return fitted, level, trend
+
+
+def _fit_ets(history):
+    y = history["y"].to_numpy(dtype="float64")
+    alpha, beta = (grid.ravel() for grid in np.meshgrid(ETS_ALPHAS, ETS_BETAS))
+    fitted, _, _ = _ets_states(y, alpha, beta)
+    sse = ((fitted[:, 1:] - y[1:]) ** 2).sum(axis=1)
+    best = int(np.argmin(sse))
+    return {"alpha": float(alpha[best]), "beta": float(beta[best])}
+
+
+def _predict_ets(model, history, periods):
+    y = history["y"].to_numpy(dtype="float64")
+    fitted, level, trend = _ets_states(y, np.array([model["alpha"]]), np.array([model["beta"]]))
+    future = level[0] + trend[0] * np.arange(1, periods + 1)
+    return np.concatenate([fitted[0], future])
+
+
+def _fit_seasonal_naive(history):
+    return {"season": SEASON if len(history) >= SEASON else 1}
+
+
+def _predict_seasonal_naive(model, history, periods):
+    y = history["y"].to_numpy(dtype="float64")
+    season = model["season"]
+    fitted = np.full(len(y), np.nan)
+    fitted[season:] = y[:-season]
+    last_season = y[-season:]
+    future = last_season[np.arange(periods) % season]
+    return np.concatenate([fitted, future])
+
+
+# =============================
+# Engine dispatch
+# =============================
+def fit_model(history, engine="prophet", settings=None):
+    """Fit ``engine`` on ``history``; ``settings`` are Prophet keyword arguments."""
+    if engine == "prophet":
+        from prophet import Prophet
+
+        model = Prophet(**(settings or {}))
+        model.fit(history)
+        return model
+    if engine == "ets":
+        return _fit_ets(history)
+    if engine == "seasonal_naive":
+        return _fit_seasonal_naive(history)
+    raise ValueError(f"Unknown forecast engine: {engine}")
+
+
+def predict(model, engine, history, periods=6):
+    if engine == "prophet":
+        future = model.make_future_dataframe(periods=periods, freq=FREQ)
+        return model.predict(future)[["ds", "yhat"]]
+
+    if engine == "ets":
+        yhat = _predict_ets(model, history, periods)
+    else:
+        yhat = _predict_seasonal_naive(model, history, periods)
+    ds = pd.concat([history["ds"], pd.Series(_future_dates(history, periods))], ignore_index=True)
+    return pd.DataFrame({"ds": ds, "yhat": yhat})
+
+
+def serialize_model(model, engine):
+    if engine == "prophet":
+        from prophet.serialize import model_to_json
+
+        return model_to_json(model)
+    return json.dumps(model)
+
+
+def deserialize_model(text, engine):
+    if engine == "prophet":
+        from prophet.serialize import model_from_json
+
+        return model_from_json(text)
+    return json.loads(text)
+
+
+class ForecastCache:
+    """Fitted models on disk plus recent forecast frames in memory."""
+
+    def __init__(self, cache_dir=None, max_forecasts=256):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "bizinsight_models")
+        self.max_forecasts = max_forecasts
+        self._forecasts = OrderedDict()
+        self._backtests = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fits = 0
+
+    def _model_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load_model(self, key, engine):
+        path = self._model_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return deserialize_model(f.read(), engine)
+        except (OSError, ValueError):
+            return None
+
+    def save_model(self, key, text):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self._model_path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self._model_path(key))
+
+    def get_forecast(self, key, periods):
+        fc = self._forecasts.get((key, periods))
+        if fc is None:
+            self.misses += 1
+            return None
+        self._forecasts.move_to_end((key, periods))
+        self.hits += 1
+        return fc
+
+    def put_forecast(self, key, periods, fc):
+        self._forecasts[(key, periods)] = fc
+        while len(self._forecasts) > self.max_forecasts:
+            self._forecasts.popitem(last=False)
+
+    def get_backtest(self, key):
+        scores = self._backtests.get(key)
+        if scores is not None:
+            self._backtests.move_to_end(key)
+        return scores
+
+    def put_backtest(self, key, scores):
+        self._backtests[key] = scores
+        while len(self._backtests) > self.max_forecasts:
+            self._backtests.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "fits": self.fits,
+                "forecasts": len(self._forecasts)}
+
+
+def _cached_forecast(history, periods, engine, settings, cache, key):
+    """Forecast from the cache or a cached model; ``None`` if a fit is needed."""
+    if cache is None:
+        return None
+    fc = cache.get_forecast(key, periods)
+    if fc is not None:
+        return fc
+    model = cache.load_model(key, engine)
+    if model is None:
+        return None
+    fc = predict(model, engine, history, periods)
+    cache.put_forecast(key, periods, fc)
+    return fc
+
+
+def _fit_and_predict(args):
+    history, periods, engine, settings = args
+    model = fit_model(history, engine, settings)
+    return serialize_model(model, engine), predict(model, engine, history, periods)
+
+
+def forecast(history, periods=6, engine="prophet", settings=None, cache=None):
+    key = series_key(history, engine, settings)
+    fc = _cached_forecast(history, periods, engine, settings, cache, key)
+    if fc is not None:
+        return fc
+
+    text, fc = _fit_and_predict((history, periods, engine, settings))
+    if cache is not None:
+        cache.fits += 1
+        cache.save_model(key, text)
+        cache.put_forecast(key, periods, fc)
+    return fc
+
+
+def forecast_many(histories, periods=6, engine="prophet", settings=None, cache=None, max_workers=None):
+    """Forecast a dict of ``name -> history`` frames, fitting misses in parallel.
+
+    Only Prophet fits go to the process pool; the NumPy baselines are faster
+    inline than the cost of pickling a frame to a worker.
+    """
+    results = {}
+    todo = []
+    for name, history in histories.items():
+        key = series_key(history, engine, settings)
+        fc = _cached_forecast(history, periods, engine, settings, cache, key)
+        if fc is not None:
+            results[name] = fc
+        elif len(history) >= 2:
+            todo.append((name, key, history))
+
+    jobs = [(history, periods, engine, settings) for _, _, history in todo]
+    if engine == "prophet" and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            fitted = list(pool.map(_fit_and_predict, jobs))
+    else:
+        fitted = [_fit_and_predict(job) for job in jobs]
+
+    for (name, key, _), (text, fc) in zip(todo, fitted):
+        if cache is not None:
+            cache.fits += 1
+            cache.save_model(key, text)
+            cache.put_forecast(key, periods, fc)
+        results[name] = fc
+    return results
+
+
+def backtest(history, engines=tuple(ENGINES), holdout=6, settings=None, cache=None):
+    """Fit each engine on all but the last ``holdout`` months and score it on them.
+
+    An engine that fails gets a row with its ``error`` instead of scores.
+    With a ``cache``, scores for an unchanged series are reused.
+    """
+    columns = ["engine", "fit_seconds", "mae", "mape", "error"]
+    if len(history) < holdout + 3:
+        return pd.DataFrame(columns=columns)
+
+    key = series_key(history, "backtest", {"engines": list(engines), "holdout": holdout, "settings": settings})
+    if cache is not None:
+        scores = cache.get_backtest(key)
+        if scores is not None:
+            return scores
+
+    train = history.iloc[:-holdout].reset_index(drop=True)
+    actual = history["y"].iloc[-holdout:].to_numpy(dtype="float64")
+    rows = []
+    for engine in engines:
+        start = time.perf_counter()
+        try:
+            model = fit_model(train, engine, settings if engine == "prophet" else None)
+            fit_seconds = time.perf_counter() - start
+            pred = predict(model, engine, train, holdout)["yhat"].to_numpy()[-holdout:]
+        except Exception as e:
+            rows.append({"engine": engine, "fit_seconds": time.perf_counter() - start, "mae": np.nan,
+                         "mape": np.nan, "error": str(e) or type(e).__name__})
+            continue
+
+        err = np.abs(actual - pred)
+        nonzero = actual != 0
+        mape = float(np.mean(err[nonzero] / np.abs(actual[nonzero])) * 100) if nonzero.any() else np.nan
+        rows.append({"engine": engine, "fit_seconds": fit_seconds, "mae": float(err.mean()), "mape": mape,
+                     "error": None})
+    scores = pd.DataFrame(rows, columns=columns)
+    if cache is not None:
+        cache.put_backtest(key, scores)
+    return scores
@@ -0,0 +1,238 @@
+"""Out-of-core ingestion for sales exports.
+
+Files are read in bounded chunks (CSV) or record batches (Parquet / Arrow) and
+only the date, sales and product columns are kept. Each chunk is cleaned and
+folded into running monthly and per-product totals, so memory stays flat no
+matter how many rows the upload has.
+"""
+import difflib
+import os
+
+import pandas as pd
+
+from normalize import VALUE_MATCH_RATE, DateNormalizer, MoneyNormalizer, date_parse_rate, money_parse_rate
+from profiling import iterate, stage
+
+CHUNK_ROWS = 250_000
+SAMPLE_ROWS = 1000
+CSV_ENCODING = "ISO-8859-1"
+
+SALES_NAMES = ["Sales", "Revenue", "Amount", "Total"]
+DATE_NAMES = ["Order Date", "Date", "order_date"]
+PRODUCT_NAMES = ["Product Name", "Item", "Product"]
+
+
+# Define column matching function
+def auto_match_column(possible_names, df_cols, sample=None, value_rate=None):
+    """Match a column by header name; with ``sample`` and ``value_rate`` given,
+    a candidate is only accepted if enough of its values parse."""
+    for name in possible_names:
+        for match in difflib.get_close_matches(name, df_cols, n=3, cutoff=0.7):
+            if sample is None or value_rate(sample[match]) >= VALUE_MATCH_RATE:
+                return match
+    return None
+
+
+def detect_columns(sample):
+    cols = list(sample.columns)
+    sales_col = auto_match_column(SALES_NAMES, cols, sample, money_parse_rate)
+    date_col = auto_match_column(DATE_NAMES, cols, sample, date_parse_rate)
+    product_col = auto_match_column(PRODUCT_NAMES, cols)
+
+    if date_col is None:
+        # No date-like header: fall back to the column whose values read best as dates
+        rates = {c: date_parse_rate(sample[c]) for c in cols if c not in (sales_col, product_col)}
+        best = max(rates, key=rates.get, default=None)
+        if best is not None and rates[best] >= VALUE_MATCH_RATE:
+            date_col = best
+
+    return {"date": date_col, "sales": sales_col, "product": product_col}
+
+
+def detect_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "csv"
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _arrow_batches(source, columns=None):
+    import pyarrow as pa
+
+    try:
+        reader = pa.ipc.open_file(_rewind(source))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        batches = iter(pa.ipc.open_stream(_rewind(source)))
+    for batch in batches:
+        if columns is not None:
+            batch = batch.select(columns)
+        yield batch
+
+
+def iter_chunks(source, fmt="csv", columns=None, chunksize=CHUNK_ROWS, dtype=None):
+    """Yield raw DataFrame chunks of at most ``chunksize`` rows."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(_rewind(source)).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "arrow":
+        for batch in _arrow_batches(source, columns):
+            # IPC batches keep whatever size they were written with
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+    else:
+        reader = pd.read_csv(_rewind(source), encoding=CSV_ENCODING, usecols=columns,
+                             dtype=dtype, chunksize=chunksize)
+        with reader:
+            yield from reader
+
+
+def read_sample(source, fmt="csv", nrows=SAMPLE_ROWS):
+    """Read the first ``nrows`` rows with every column, for detection and preview."""
+    if fmt == "csv":
+        return pd.read_csv(_rewind(source), encoding=CSV_ENCODING, nrows=nrows)
+    for chunk in iter_chunks(source, fmt, chunksize=nrows):
+        return chunk
+    return pd.DataFrame()
+
+
+def csv_dtypes(sample, date_col, sales_col, product_col):
+    """Pick read dtypes for the remaining chunks based on the first one."""
+    dtype = {date_col: "object"}
+    if product_col:
+        dtype[product_col] = "category"
+    if not pd.api.types.is_numeric_dtype(sample[sales_col]):
+        # Currency strings like "$1,200" — cleaned per chunk
+        dtype[sales_col] = "object"
+    return dtype
+
+
+def build_normalizers(sample, date_col, sales_col):
+    """Sniff date and money formats once from the first chunk."""
+    return DateNormalizer.from_sample(sample[date_col]), MoneyNormalizer.from_sample(sample[sales_col])
+
+
+def clean_chunk(chunk, date_col, sales_col, product_col=None, dates=None, money=None, profiler=None):
+    """Convert the key columns in place; rows are not dropped here."""
+    if dates is None or money is None:
+        dates, money = build_normalizers(chunk, date_col, sales_col)
+    with stage(profiler, "parse_money", len(chunk)):
+        chunk[sales_col] = money(chunk[sales_col])
+    with stage(profiler, "parse_dates", len(chunk)):
+        chunk[date_col] = dates(chunk[date_col])
+    if product_col and product_col in chunk.columns:
+        chunk[product_col] = chunk[product_col].astype("category")
+    return chunk
+
+
+def monthly_frame(totals, date_col, sales_col):
+    """Turn per-month totals (a Period-indexed Series) into month-end rows with
+    empty months filled, like ``resample('M').sum()``."""
+    if totals is None or totals.empty:
+        return pd.DataFrame({date_col: pd.to_datetime([]), sales_col: []})
+    months = pd.period_range(totals.index.min(), totals.index.max(), freq="M")
+    totals = totals.reindex(months, fill_value=0.0)
+    return pd.DataFrame({
+        date_col: months.to_timestamp(how="end").normalize(),
+        sales_col: totals.to_numpy(dtype="float64"),
+    })
+
+
+def _fold(running, part):
+    return part.astype("float64") if running is None else running.add(part, fill_value=0)
+
+
+class StreamingAggregator:
+    """Running monthly and per-product sales totals over cleaned chunks.
+
+    Sales stay float64: float32 sums drift visibly over millions of rows, and
+    the per-chunk columns are small once everything but the key columns is
+    dropped.
+    """
+
+    def __init__(self, date_col, sales_col, product_col=None, dates=None, money=None):
+        self.date_col = date_col
+        self.sales_col = sales_col
+        self.product_col = product_col
+        self.rows_read = 0
+        self.rows_kept = 0
+        self.sales_parsed = 0
+        self.dates = dates
+        self.money = money
+        self._monthly = None
+        self._products = None
+
+    def add(self, chunk):
+        """Fold a cleaned chunk in and return its valid rows."""
+        self.rows_read += len(chunk)
+        self.sales_parsed += int(chunk[self.sales_col].notna().sum())
+        chunk = chunk.dropna(subset=[self.date_col, self.sales_col])
+        self.rows_kept += len(chunk)
+        if chunk.empty:
+            return chunk
+
+        sales = chunk[self.sales_col]
+        month = chunk[self.date_col].dt.to_period("M")
+        self._monthly = _fold(self._monthly, sales.groupby(month).sum())
+        if self.product_col and self.product_col in chunk.columns:
+            by_product = sales.groupby(chunk[self.product_col], observed=True).sum()
+            # Category sets differ from chunk to chunk, so fold on plain string keys
+            by_product.index = by_product.index.astype(str)
+            self._products = _fold(self._products, by_product)
+        return chunk
+
+    def cleaning_report(self):
+        """Rows converted or rejected by each date/money rule."""
+        report = {}
+        for normalizer in (self.dates, self.money):
+            if normalizer is not None:
+                report.update(normalizer.counts)
+        return report
+
+    def monthly_sales(self):
+        return monthly_frame(self._monthly, self.date_col, self.sales_col)
+
+    def product_sales(self):
+        if not self.product_col:
+            return None
+        if self._products is None:
+            return pd.Series(dtype="float64", name=self.sales_col)
+        totals = self._products.astype("float64")
+        totals.index.name = self.product_col
+        return totals.rename(self.sales_col)
+
+
+def stream_aggregate(source, fmt, date_col, sales_col, product_col=None,
+                     chunksize=CHUNK_ROWS, sample=None, sinks=(), profiler=None):
+    """Read ``source`` chunk by chunk and return a filled ``StreamingAggregator``.
+
+    Each of ``sinks`` gets ``add(rows)`` with the valid rows of every chunk.
+    With a ``profiler``, reading, parsing, aggregation and each sink are
+    timed as separate stages.
+    """
+    columns = [c for c in dict.fromkeys([date_col, sales_col, product_col]) if c]
+    if sample is None:
+        sample = read_sample(source, fmt)
+    dtype = csv_dtypes(sample, date_col, sales_col, product_col) if fmt == "csv" else None
+    dates, money = build_normalizers(sample, date_col, sales_col)
+
+    agg = StreamingAggregator(date_col, sales_col, product_col, dates=dates, money=money)
+    chunks = iter_chunks(source, fmt, columns=columns, chunksize=chunksize, dtype=dtype)
+    for chunk in iterate(profiler, f"read_{fmt}", chunks):
+        clean_chunk(chunk, date_col, sales_col, product_col, dates, money, profiler)
+        with stage(profiler, "aggregate", len(chunk)):
+            rows = agg.add(chunk)
+        for sink in sinks:
+            with stage(profiler, type(sink).__name__, len(rows)):
+                sink.add(rows)
+    return agg
@@ -0,0 +1,305 @@
+"""Concurrent, TTL-cached market signals for the Product Growth Advisor.
+
+Google Trends and NewsAPI calls run on a thread pool with per-provider rate
+limits and retry/backoff. Trends lookups are batched up to five products per
+pytrends payload, and finished results are cached in memory and on disk keyed
+by product and timeframe. Providers are pluggable: the ``Fake*`` ones stand in
+for the real APIs in tests and offline benchmarks.
+"""
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+TRENDS_BATCH = 5  # pytrends accepts at most five keywords per payload
+DEFAULT_TIMEFRAME = "today 3-m"
+DEFAULT_TTL = 6 * 60 * 60
+
+
+class RateLimiter:
+    """Space calls at least ``1 / per_second`` apart, with at most
+    ``max_concurrent`` in flight."""
+
+    def __init__(self, per_second=1.0, max_concurrent=2):
+        self.min_interval = 1.0 / per_second if per_second else 0.0
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
+def with_retry(fn, *args, attempts=3, backoff=1.0):
+    for attempt in range(attempts):
+        try:
+            return fn(*args)
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            # Exponential backoff with jitter so parallel retries don't line up
+            time.sleep(backoff * 2 ** attempt * (1 + random.random() / 2))
+
+
+class TTLCache:
+    """JSON-serializable values in memory, mirrored to disk, expiring after ``ttl`` seconds."""
+
+    def __init__(self, ttl=DEFAULT_TTL, cache_dir=None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key):
+        key = list(key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(json.dumps(key))
+        if entry is None and self.cache_dir:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+        if entry is None or now - entry["at"] > self.ttl:
+            self.misses += 1
+            return None
+        with self._lock:
+            self._entries[json.dumps(key)] = entry
+        self.hits += 1
+        return entry["value"]
+
+    def put(self, key, value):
+        key = list(key)
+        entry = {"at": time.time(), "value": value}
+        with self._lock:
+            self._entries[json.dumps(key)] = entry
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+
+
+# =============================
+# Providers
+# =============================
+class TrendsProvider:
+    """Interface: ``fetch(keywords, timeframe)`` returns ``(interest_df, related)``,
+    shaped like pytrends' ``interest_over_time()`` and ``related_queries()``."""
+
+    limiter = RateLimiter(per_second=1.0, max_concurrent=1)
+
+    def fetch(self, keywords, timeframe):
+        raise NotImplementedError
+
+
+class NewsProvider:
+    """Interface: ``fetch(query)`` returns a list of headline strings."""
+
+    limiter = RateLimiter(per_second=5.0, max_concurrent=4)
+
+    def fetch(self, query):
+        raise NotImplementedError
+
+
+class GoogleTrendsProvider(TrendsProvider):
+    def __init__(self, hl='en-US', tz=360):
+        self.hl = hl
+        self.tz = tz
+
+    def fetch(self, keywords, timeframe):
+        from pytrends.request import TrendReq
+
+        # TrendReq keeps payload state, so each batch gets its own client
+        pytrends = TrendReq(hl=self.hl, tz=self.tz)
+        pytrends.build_payload(list(keywords), cat=0, timeframe=timeframe, geo='', gprop='')
+        return pytrends.interest_over_time(), pytrends.related_queries()
+
+
+class NewsApiProvider(NewsProvider):
+    def __init__(self, api_key):
+        from newsapi import NewsApiClient
+
+        self.client = NewsApiClient(api_key=api_key)
+
+    def fetch(self, query):
+        news = self.client.get_everything(q=query, language='en', sort_by='relevancy', page_size=5)
+        return [article['title'] for article in news['articles']]
+
+
+def _seed(*parts):
+    return int(hashlib.sha256("|".join(parts).encode()).hexdigest()[:8], 16)
+
+
+class FakeTrendsProvider(TrendsProvider):
+    """Deterministic stand-in for Google Trends; ``latency`` simulates a round-trip."""
+
+    limiter = RateLimiter(per_second=0, max_concurrent=8)
+
+    def __init__(self, latency=0.0, weeks=13):
+        self.latency = latency
+        self.weeks = weeks
+        self.calls = 0
+
+    def fetch(self, keywords, timeframe):
+        self.calls += 1
+        time.sleep(self.latency)
+        index = pd.date_range(end="2024-01-07", periods=self.weeks, freq="W")
+        data, related = {}, {}
+        for kw in keywords:
+            rng = np.random.default_rng(_seed(kw, timeframe))
+            data[kw] = np.clip(50 + rng.normal(rng.uniform(-2, 2), 5, self.weeks).cumsum(), 1, 100)
+            related[kw] = {"top": pd.DataFrame({"query": [f"{kw} {w}" for w in ("review", "price", "sale")],
+                                               "value": [100, 80, 60]}), "rising": None}
+        return pd.DataFrame(data, index=index), related
+
+
+class FakeNewsProvider(NewsProvider):
+    limiter = RateLimiter(per_second=0, max_concurrent=8)
+
+    headlines = [
+        "{} sales soar as shoppers love the new design",
+        "Analysts see steady demand for {}",
+        "{} recall raises quality concerns",
+        "Is {} worth it? A balanced look",
+        "Retailers report strong {} growth this quarter",
+    ]
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def fetch(self, query):
+        self.calls += 1
+        time.sleep(self.latency)
+        rng = np.random.default_rng(_seed(query))
+        picks = rng.choice(len(self.headlines), size=3, replace=False)
+        return [self.headlines[i].format(query) for i in picks]
+
+
+# =============================
+# Fetcher
+# =============================
+def _trend_stats(interest, related, product):
+    if interest.empty or product not in interest.columns:
+        trend_score, trend_change = 0.0, 0.0
+    else:
+        series = interest[product]
+        trend_score = float(series.mean())
+        trend_change = float(series.pct_change().mean() * 100)
+    related_top = (related or {}).get(product, {}).get('top')
+    keywords = []
+    if related_top is not None and not related_top.empty:
+        keywords = related_top['query'].head(3).tolist()
+    return {"trend_score": trend_score, "trend_change": trend_change, "related": keywords}
+
+
+class MarketSignalFetcher:
+    """Fetch trend and news signals for many products concurrently.
+
+    Note that Google Trends scales every keyword in a payload against the
+    others, so ``trend_score`` is relative within a batch; ``trend_change`` is
+    unaffected.
+    """
+
+    def __init__(self, trends=None, news=None, ttl=DEFAULT_TTL, cache_dir=None,
+                 max_workers=4, attempts=3, backoff=1.0):
+        self.trends = trends
+        self.news = news
+        self.cache = TTLCache(ttl, cache_dir or os.path.join(tempfile.gettempdir(), "bizinsight_signals"))
+        self.max_workers = max_workers
+        self.attempts = attempts
+        self.backoff = backoff
+
+    def _call(self, provider, *args):
+        def guarded():
+            with provider.limiter:
+                return provider.fetch(*args)
+        return with_retry(guarded, attempts=self.attempts, backoff=self.backoff)
+
+    def _trend_batch(self, batch, timeframe):
+        interest, related = self._call(self.trends, batch, timeframe)
+        results = {}
+        for product in batch:
+            results[product] = _trend_stats(interest, related, product)
+            self.cache.put(("trends", product, timeframe), results[product])
+        return results
+
+    def _news(self, product):
+        headlines = self._call(self.news, product)
+        self.cache.put(("news", product), headlines)
+        return headlines
+
+    def fetch(self, products, timeframe=DEFAULT_TIMEFRAME):
+        """Return ``{product: signals}``; each signals dict holds ``trend_score``,
+        ``trend_change``, ``related``, ``headlines`` and ``trend_error`` / ``news_error``
+        messages when a provider failed."""
+        products = [str(p) for p in products]
+        signals = {p: {"trend_error": None, "news_error": None} for p in products}
+
+        trend_todo, news_todo = [], []
+        for p in products:
+            trend = self.cache.get(("trends", p, timeframe)) if self.trends else None
+            if trend is not None:
+                signals[p].update(trend)
+            elif self.trends:
+                trend_todo.append(p)
+            headlines = self.cache.get(("news", p)) if self.news else None
+            if headlines is not None:
+                signals[p]["headlines"] = headlines
+            elif self.news:
+                news_todo.append(p)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            trend_jobs = {
+                pool.submit(self._trend_batch, batch, timeframe): batch
+                for batch in (trend_todo[i:i + TRENDS_BATCH] for i in range(0, len(trend_todo), TRENDS_BATCH))
+            }
+            news_jobs = {pool.submit(self._news, p): p for p in news_todo}
+
+            for job, batch in trend_jobs.items():
+                try:
+                    for p, trend in job.result().items():
+                        signals[p].update(trend)
+                except Exception as e:
+                    for p in batch:
+                        signals[p]["trend_error"] = str(e)
+            for job, p in news_jobs.items():
+                try:
+                    signals[p]["headlines"] = job.result()
+                except Exception as e:
+                    signals[p]["news_error"] = str(e)
+
+        for s in signals.values():
+            s.setdefault("trend_score", 0.0)
+            s.setdefault("trend_change", 0.0)
+            s.setdefault("related", [])
+            s.setdefault("headlines", [])
+        return signals
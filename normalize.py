@@ -0,0 +1,321 @@
+"""Vectorized date and currency normalization.
+
+Both normalizers sniff the format from a sample once, then parse each distinct
+raw string only once and map the results back by position — order dates and
+price points repeat heavily, so this is far cheaper than parsing every row.
+Every normalizer keeps ``counts``: how many rows each rule converted or rejected.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+SNIFF_ROWS = 200
+VALUE_MATCH_RATE = 0.8
+
+# Order matters: on ties the earlier format wins, so month-first beats
+# day-first just like pandas' own default.
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%y",
+    "%d/%m/%y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%d-%b-%y",
+    "%Y%m%d",
+]
+
+_COMMA_DECIMAL = re.compile(r"\d,\d{1,2}$|\d\.\d{3},")
+_DOT_DECIMAL = re.compile(r"\d\.\d{1,2}$|\d,\d{3}\.")
+_MONEY_TRAILER = re.compile(r"[^\d]+$")
+
+# Currency symbols and the common ISO codes; anything else around the number
+# (SKU prefixes, date dashes, units) makes the value non-money.
+_CURRENCY = (r"(?:US\$|[ACNR]\$|[$€£¥₹₩₽]|Rs\.?|USD|EUR|GBP|JPY|INR|CAD|AUD|NZD|CHF|CNY|SEK|NOK|DKK"
+             r"|BRL|MXN|ZAR)")
+_MONEY = re.compile(
+    rf"^(?P<sign>[-+(])?\s*(?P<pre>{_CURRENCY})?\s*(?P<sign2>[-+(])?\s*"
+    rf"(?P<num>[\d.,](?:[\d.,' ]*\d)?)\s*(?P<post>{_CURRENCY})?\s*(?P<close>[-)])?$",
+    re.IGNORECASE,
+)
+_DIGIT_GROUPS = re.compile(r"\d{1,3}(?P<sep>[,.' ])\d{3}(?:(?P=sep)\d{3})*")
+
+
+# Above this share of distinct values per chunk (order timestamps), memoizing
+# costs more than it saves
+MEMO_DISTINCT_RATIO = 0.5
+
+
+def _to_datetime(text, fmt):
+    """Vectorized parse to naive UTC ``datetime64[ns]``; ``fmt`` may also be
+    ``"ISO8601"`` or ``"mixed"``. Unparseable values become NaT."""
+    parsed = pd.to_datetime(text, format=fmt, errors="coerce", utc=True)
+    return pd.DatetimeIndex(parsed).tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+def _guess_formats(sample, n=5):
+    """Formats pandas guesses for the first few sample values, beyond ``DATE_FORMATS``."""
+    try:
+        from pandas.tseries.api import guess_datetime_format
+    except ImportError:  # pandas < 2.2
+        from pandas._libs.tslibs.parsing import guess_datetime_format
+    guesses = (guess_datetime_format(v) for v in sample.head(n))
+    return [g for g in dict.fromkeys(guesses) if g and g not in DATE_FORMATS]
+
+
+def _distinct_sample(values, n=SNIFF_ROWS):
+    values = pd.Series(values).dropna()
+    return values.astype(str).str.strip().drop_duplicates().head(n)
+
+
+def _factorize(values):
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _row_counts(codes, n_uniques):
+    return np.bincount(codes[codes >= 0], minlength=n_uniques)
+
+
+def sniff_date_format(values):
+    """Return the candidate format that parses most of the sample, or ``None``."""
+    sample = _distinct_sample(values)
+    if sample.empty:
+        return None
+    best, best_rate = None, 0.0
+    for fmt in DATE_FORMATS:
+        rate = pd.notna(_to_datetime(sample, fmt)).mean()
+        if rate > best_rate:
+            best, best_rate = fmt, rate
+    if best_rate < 1.0:
+        for fmt in _guess_formats(sample):
+            rate = pd.notna(_to_datetime(sample, fmt)).mean()
+            if rate > best_rate:
+                best, best_rate = fmt, rate
+    return best
+
+
+def sniff_decimal_separator(values):
+    """Return ``","`` when the sample looks like ``1.234,56`` money, else ``"."``."""
+    sample = _distinct_sample(values).str.replace(_MONEY_TRAILER, "", regex=True)
+    comma = sample.str.contains(_COMMA_DECIMAL).sum()
+    dot = sample.str.contains(_DOT_DECIMAL).sum()
+    return "," if comma > dot else "."
+
+
+class DateNormalizer:
+    """Parse raw date values with a sniffed format, then vectorized ISO 8601
+    and mixed-format fallbacks for whatever the format missed.
+
+    Parsed dates are memoized across calls in an index plus aligned arrays, so
+    a chunked ingest parses each distinct date string once for the whole file.
+    Chunks that are mostly distinct (timestamps) skip the memo.
+    """
+
+    max_memo = 1_000_000
+
+    def __init__(self, fmt=None):
+        self.fmt = fmt
+        self.counts = Counter()
+        self._clear_memo()
+
+    def _clear_memo(self):
+        self._memo_index = pd.Index([], dtype=object)
+        self._memo_dates = np.array([], dtype="datetime64[ns]")
+        self._memo_rules = np.array([], dtype=object)
+
+    @classmethod
+    def from_sample(cls, values):
+        return cls(sniff_date_format(values))
+
+    def __call__(self, values):
+        values = pd.Series(values)
+        if pd.api.types.is_datetime64_any_dtype(values):
+            self.counts["date:native"] += int(values.notna().sum())
+            self.counts["date:rejected"] += int(values.isna().sum())
+            return values.dt.tz_convert(None) if values.dt.tz is not None else values
+
+        codes, uniques = _factorize(values)
+        if len(uniques) > MEMO_DISTINCT_RATIO * len(values):
+            parsed, rules = self._parse(uniques)
+        else:
+            parsed, rules = self._lookup(uniques)
+
+        rule_codes, rule_names = pd.factorize(rules)
+        per_rule = np.bincount(rule_codes, weights=_row_counts(codes, len(uniques)), minlength=len(rule_names))
+        for rule, n in zip(rule_names, per_rule):
+            if n:
+                self.counts[rule] += int(n)
+        self.counts["date:rejected"] += int((codes < 0).sum())
+
+        out = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+        hit = codes >= 0
+        out[hit] = parsed[codes[hit]]
+        return pd.Series(out, index=values.index, name=values.name)
+
+    def _lookup(self, uniques):
+        """Dates and rules for ``uniques``, parsing only those not yet memoized."""
+        if len(self._memo_index) + len(uniques) > self.max_memo:
+            self._clear_memo()
+        pos = self._memo_index.get_indexer(uniques)
+        new = pos < 0
+        if new.any():
+            parsed, rules = self._parse(uniques[new])
+            pos[new] = len(self._memo_index) + np.arange(int(new.sum()))
+            self._memo_index = self._memo_index.append(pd.Index(uniques[new], dtype=object))
+            self._memo_dates = np.concatenate([self._memo_dates, parsed])
+            self._memo_rules = np.concatenate([self._memo_rules, rules])
+        return self._memo_dates[pos], self._memo_rules[pos]
+
+    def _parse(self, raw):
+        text = pd.Series(raw, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+        parsed = np.full(len(text), np.datetime64("NaT"), dtype="datetime64[ns]")
+        rules = np.full(len(text), "date:rejected", dtype=object)
+        todo = np.ones(len(text), dtype=bool)
+        # Sniffed format first, then one vectorized pass each for ISO 8601 and
+        # anything else pandas can read; no per-value Python parsing
+        for fmt, rule in ((self.fmt, f"date:{self.fmt}"), ("ISO8601", "date:fallback"),
+                          ("mixed", "date:fallback")):
+            if fmt is None or not todo.any():
+                continue
+            idx = np.flatnonzero(todo)
+            out = _to_datetime(text[idx], fmt)
+            ok = ~np.isnat(out)
+            parsed[idx[ok]] = out[ok]
+            rules[idx[ok]] = rule
+            todo[idx[ok]] = False
+        return parsed, rules
+
+
+class MoneyNormalizer:
+    """Parse currency strings: symbols, thousands separators, ``(negatives)``
+    and ``1.234,56`` decimal commas."""
+
+    def __init__(self, decimal="."):
+        self.decimal = decimal
+        self.counts = Counter()
+
+    @classmethod
+    def from_sample(cls, values):
+        return cls(sniff_decimal_separator(values))
+
+    def __call__(self, values):
+        values = pd.Series(values)
+        if pd.api.types.is_numeric_dtype(values):
+            out = values.astype("float64")
+            self.counts["money:numeric"] += int(out.notna().sum())
+            self.counts["money:rejected"] += int(out.isna().sum())
+            return out
+
+        codes, uniques = _factorize(values)
+        parsed, rules = self._parse(uniques)
+        for rule, n in zip(rules, _row_counts(codes, len(uniques))):
+            if n:
+                self.counts[rule] += int(n)
+        self.counts["money:rejected"] += int((codes < 0).sum())
+
+        out = np.full(len(values), np.nan)
+        hit = codes >= 0
+        out[hit] = parsed[codes[hit]]
+        return pd.Series(out, index=values.index, name=values.name)
+
+    def _parse(self, uniques):
+        number = np.full(len(uniques), np.nan)
+        rules = np.full(len(uniques), "money:rejected", dtype=object)
+        for i, raw in enumerate(uniques):
+            parsed = self._parse_one(str(raw).strip())
+            if parsed is not None:
+                number[i], rules[i] = parsed
+        return number, rules
+
+    def _parse_one(self, text):
+        """``(value, rule)`` for one money string, or ``None`` if it isn't money."""
+        m = _MONEY.match(text)
+        if m is None:
+            return None
+        if m["sign"] and m["sign2"]:
+            return None
+        opened = "(" in (m["sign"], m["sign2"])
+        if opened != (m["close"] == ")"):
+            return None
+        parsed = self._parse_number(m["num"])
+        if parsed is None:
+            return None
+        value, grouped, decimal_comma = parsed
+        if opened or "-" in (m["sign"], m["sign2"], m["close"]):
+            value = -value
+
+        if opened:
+            rule = "money:parentheses"
+        elif m["pre"] or m["post"]:
+            rule = "money:currency_symbol"
+        elif grouped:
+            rule = "money:thousands"
+        elif decimal_comma:
+            rule = "money:decimal_comma"
+        else:
+            rule = "money:plain"
+        return value, rule
+
+    def _parse_number(self, num):
+        """Split digit groups from the decimal part. With both ``,`` and ``.``
+        the last one is the decimal mark; a lone separator followed by exactly
+        three digits is ambiguous and falls back to the sniffed one."""
+        marks = [c for c in num if c in ",."]
+        decimal = None
+        if len(set(marks)) == 2:
+            decimal = marks[-1]
+        elif marks and len(marks) == 1:
+            mark = marks[0]
+            digits_after = len(num) - num.index(mark) - 1
+            decimal = mark if digits_after != 3 or mark == self.decimal else None
+
+        whole, frac = num.rsplit(decimal, 1) if decimal else (num, "")
+        if decimal and not frac.isdigit():
+            return None
+        grouped = not whole.isdigit()
+        if grouped:
+            groups = _DIGIT_GROUPS.fullmatch(whole)
+            if (whole or not frac) and (groups is None or groups["sep"] == decimal):
+                return None
+        value = float((re.sub(r"\D", "", whole) or "0") + "." + (frac or "0"))
+        return value, grouped and bool(whole), decimal == ","
+
+
+def date_parse_rate(values):
+    """Share of a sample that parses as dates; numeric columns score zero."""
+    values = pd.Series(values).dropna().head(SNIFF_ROWS)
+    if values.empty:
+        return 0.0
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 1.0
+    if pd.api.types.is_numeric_dtype(values):
+        return 0.0
+    return float(DateNormalizer.from_sample(values)(values).notna().mean())
+
+
+def money_parse_rate(values):
+    values = pd.Series(values).dropna().head(SNIFF_ROWS)
+    if values.empty:
+        return 0.0
+    return float(MoneyNormalizer.from_sample(values)(values).notna().mean())
@@ -0,0 +1,155 @@
+"""Content-addressed cache for the upload → clean → aggregate pipeline.
+
+Streamlit reruns the whole script on every widget interaction. Entries are keyed
+by a hash of the uploaded bytes plus the chosen column mapping, so a rerun on the
+same file skips parsing, cleaning and aggregation entirely.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def make_cache_key(file_bytes, column_mapping):
+    h = hashlib.sha256()
+    h.update(file_bytes)
+    h.update(json.dumps(column_mapping, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _frame_bytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    return int(getattr(obj, "nbytes", 0))
+
+
+class PipelineCache:
+    """Size-bounded LRU of cleaned frames and their derived aggregates.
+
+    Frames larger than ``spill_threshold`` bytes are written to Parquet under
+    ``spill_dir`` and only the aggregates stay in memory. ``max_bytes`` bounds
+    the in-memory footprint and ``max_spill_bytes`` the on-disk one; the least
+    recently used entries are evicted first.
+
+    One instance is shared by every Streamlit session, each on its own thread,
+    so all bookkeeping happens under a lock.
+    """
+
+    def __init__(self, max_bytes=1_000_000_000, spill_threshold=200_000_000,
+                 max_spill_bytes=5_000_000_000, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_threshold = spill_threshold
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "bizinsight_cache")
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """Return ``(df, aggregates)`` for ``key`` or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry["frame"] is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["frame"], entry["aggregates"]
+
+        # Read spilled frames outside the lock so other sessions aren't blocked on disk
+        try:
+            df = pd.read_parquet(entry["path"])
+        except (OSError, ValueError, ImportError):
+            # Spill file vanished (possibly evicted meanwhile) or is unreadable — treat as a miss.
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._drop(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return df, entry["aggregates"]
+
+    def put(self, key, df, aggregates):
+        agg_bytes = sum(_frame_bytes(v) for v in aggregates.values())
+        df_bytes = _frame_bytes(df)
+        entry = {"frame": df, "path": None, "aggregates": aggregates,
+                 "mem_bytes": df_bytes + agg_bytes, "disk_bytes": 0}
+
+        # The spill file is named by key, so replacing an entry and writing its
+        # new spill file must happen together
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if df_bytes > self.spill_threshold:
+                path = self._spill(key, df)
+                if path is not None:
+                    entry.update(frame=None, path=path, mem_bytes=agg_bytes,
+                                 disk_bytes=os.path.getsize(path))
+
+            self._entries[key] = entry
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "mem_bytes": sum(e["mem_bytes"] for e in self._entries.values()),
+                "disk_bytes": sum(e["disk_bytes"] for e in self._entries.values()),
+            }
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def _spill(self, key, df):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"{key}.parquet")
+        try:
+            df.to_parquet(path, index=False)
+        except (ImportError, ValueError, TypeError):
+            # No Parquet engine or a column Arrow can't store — keep it in memory.
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+        return path
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        if entry["path"] and os.path.exists(entry["path"]):
+            os.remove(entry["path"])
+
+    def _evict(self):
+        stats = self.stats()
+        mem, disk = stats["mem_bytes"], stats["disk_bytes"]
+        # Always keep the entry that was just inserted.
+        while len(self._entries) > 1 and (mem > self.max_bytes or disk > self.max_spill_bytes):
+            key = next(iter(self._entries))
+            mem -= self._entries[key]["mem_bytes"]
+            disk -= self._entries[key]["disk_bytes"]
+            self._drop(key)
+            self.evictions += 1
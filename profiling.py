@@ -0,0 +1,173 @@
+"""Stage-level wall time, throughput and memory for the pipeline.
+
+A ``StageProfiler`` records every ``with profiler.stage(name):`` block. A
+background thread samples resident memory while any stage is open, so each
+stage reports its own peak RSS rather than the process-wide high-water mark.
+Repeated stages (one per chunk) are summed into a single row. Pipeline
+functions take ``profiler=None`` and use the module-level ``stage`` helper,
+which is a no-op without a profiler.
+
+Memory comes from ``/proc`` on Linux and from ``psutil`` elsewhere when it's
+installed; without either (e.g. plain Windows) RSS columns are ``None`` and
+only timings are reported.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SAMPLE_INTERVAL = 0.01
+
+
+def _psutil_memory():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def rss_bytes():
+    """Current resident set size of this process, or ``None`` if unknown."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+    memory = _psutil_memory()
+    return None if memory is None else memory.rss
+
+
+def peak_rss_bytes():
+    """Process-lifetime peak RSS, or ``None`` if unknown."""
+    if resource is None:
+        memory = _psutil_memory()
+        # peak_wset is the Windows peak working set
+        return None if memory is None else getattr(memory, "peak_wset", memory.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def to_mb(n):
+    return None if n is None else round(n / 2 ** 20, 1)
+
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+class _Record:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.peak_rss = None
+        self.rss_delta = None
+
+
+class StageProfiler:
+    def __init__(self, sample_interval=SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self.started = time.time()
+        self._records = {}
+        self._open = []
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                if not self._open:
+                    self._sampler = None
+                    return
+                rss = rss_bytes()
+                for record in self._open:
+                    record.peak_rss = _max(record.peak_rss, rss)
+            time.sleep(self.sample_interval)
+
+    def stage(self, name, rows=None):
+        """Time a block; ``rows`` (or ``record.rows += n`` inside it) sets the
+        row count used for throughput."""
+        return self._stage(name, rows)
+
+    @contextmanager
+    def _stage(self, name, rows=None, calls=1):
+        before = rss_bytes()
+        with self._lock:
+            record = self._records.setdefault(name, _Record(name))
+            self._open.append(record)
+            if self._sampler is None and before is not None:
+                self._sampler = threading.Thread(target=self._sample, daemon=True)
+                self._sampler.start()
+        record.peak_rss = _max(record.peak_rss, before)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            after = rss_bytes()
+            with self._lock:
+                self._open.remove(record)
+                record.calls += calls
+                record.seconds += elapsed
+                record.rows += rows or 0
+                record.peak_rss = _max(record.peak_rss, after)
+                if before is not None and after is not None:
+                    record.rss_delta = (record.rss_delta or 0) + after - before
+
+    def iterate(self, name, iterable):
+        """Yield from ``iterable``, timing each ``next()`` under ``name`` and
+        counting the length of every item as rows."""
+        iterator = iter(iterable)
+        while True:
+            # The final, exhausting next() is timed but isn't counted as a call
+            with self._stage(name, calls=0) as record:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                record.rows += len(item)
+                record.calls += 1
+            yield item
+
+    def report(self):
+        """One dict per stage, in the order stages first ran."""
+        rows = []
+        for r in self._records.values():
+            rows.append({
+                "stage": r.name,
+                "calls": r.calls,
+                "seconds": round(r.seconds, 6),
+                "rows": r.rows,
+                "rows_per_second": round(r.rows / r.seconds, 1) if r.rows and r.seconds else None,
+                "peak_rss_mb": to_mb(r.peak_rss),
+                "rss_delta_mb": to_mb(r.rss_delta),
+            })
+        return rows
+
+    def to_json(self, **extra):
+        return json.dumps({
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "process_peak_rss_mb": to_mb(peak_rss_bytes()),
+            **extra,
+            "stages": self.report(),
+        }, indent=2, default=str)
+
+
+def stage(profiler, name, rows=None):
+    """``profiler.stage(name, rows)``, or a no-op context without a profiler."""
+    return nullcontext() if profiler is None else profiler.stage(name, rows)
+
+
+def iterate(profiler, name, iterable):
+    return iterable if profiler is None else profiler.iterate(name, iterable)
@@ -0,0 +1,120 @@
+"""Headless batch reports: ``python report.py STORE_DIR --out REPORT_DIR``.
+
+Every sales export in ``STORE_DIR`` (CSV, Parquet or Arrow) is processed in its
+own worker process through the same core pipeline as the dashboard. Each one
+gets a folder under ``REPORT_DIR``, named after the file including its
+extension, with ``summary.json``, ``monthly_sales.parquet``,
+``forecast.parquet``, ``advisor.json`` and per-stage timings in
+``profile.json``; ``index.json`` lists the status of every file.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from forecasting import ENGINES
+
+INPUT_EXTENSIONS = (".csv", ".parquet", ".pq", ".arrow", ".feather")
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str, ensure_ascii=False)
+
+
+def process_file(path, out_dir, engine="ets", periods=6, top_n=3, advisor=True,
+                 offline=False, api_key=None):
+    """Build one store's report; returns its ``index.json`` entry."""
+    from core import business_summary, default_fetcher, forecast_sales, growth_advice, load_dataset
+    from forecasting import ForecastCache
+    from profiling import StageProfiler
+
+    # Keep the extension so store1.csv and store1.parquet don't share a folder
+    target = os.path.join(out_dir, os.path.basename(path))
+    start = time.perf_counter()
+    profiler = StageProfiler()
+    try:
+        dataset = load_dataset(path, profiler=profiler)
+        os.makedirs(target, exist_ok=True)
+
+        top = dataset.product_sales.nlargest(10) if dataset.product_sales is not None else None
+        _write_json(os.path.join(target, "summary.json"), {
+            "source": os.path.abspath(path),
+            "columns": dataset.columns,
+            "rows_read": dataset.rows_read,
+            "rows_kept": dataset.rows_kept,
+            "cleaning_report": dataset.cleaning_report,
+            "summary": business_summary(dataset),
+            "top_products": top.to_dict() if top is not None else {},
+        })
+        dataset.monthly_sales.to_parquet(os.path.join(target, "monthly_sales.parquet"), index=False)
+
+        fc = forecast_sales(dataset, periods=periods, engine=engine,
+                            cache=ForecastCache(os.path.join(out_dir, ".models")), profiler=profiler)
+        if fc is not None:
+            fc.to_parquet(os.path.join(target, "forecast.parquet"), index=False)
+
+        if advisor:
+            fetcher = default_fetcher(api_key=api_key, offline=offline,
+                                      cache_dir=os.path.join(out_dir, ".signals"))
+            advice = growth_advice(dataset, top_n, fetcher, profiler=profiler)
+            _write_json(os.path.join(target, "advisor.json"), advice)
+        with open(os.path.join(target, "profile.json"), "w", encoding="utf-8") as f:
+            f.write(profiler.to_json(source=os.path.abspath(path)))
+    except Exception as e:
+        return {"file": path, "status": "failed", "error": str(e),
+                "seconds": round(time.perf_counter() - start, 3)}
+    return {"file": path, "status": "ok", "output": target,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+def find_inputs(input_dir):
+    return sorted(
+        os.path.join(input_dir, f) for f in os.listdir(input_dir)
+        if f.lower().endswith(INPUT_EXTENSIONS) and os.path.isfile(os.path.join(input_dir, f))
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build BizInsight reports for a directory of sales files.")
+    parser.add_argument("input_dir", help="Directory of sales CSV / Parquet / Arrow files")
+    parser.add_argument("--out", default="reports", help="Output directory (default: reports)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=list(ENGINES), default="ets", help="Forecast engine (default: ets)")
+    parser.add_argument("--periods", type=int, default=6, help="Months to forecast (default: 6)")
+    parser.add_argument("--top-n", type=int, default=3, help="Products covered by the advisor (default: 3)")
+    parser.add_argument("--no-advisor", action="store_true", help="Skip the Google Trends / news advisor")
+    parser.add_argument("--offline", action="store_true", help="Use local fake market data instead of the APIs")
+    args = parser.parse_args(argv)
+
+    inputs = find_inputs(args.input_dir)
+    if not inputs:
+        print(f"No sales files found in {args.input_dir}", file=sys.stderr)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    options = {
+        "engine": args.engine, "periods": args.periods, "top_n": args.top_n,
+        "advisor": not args.no_advisor, "offline": args.offline,
+        "api_key": os.environ.get("NEWSAPI_KEY"),
+    }
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = [pool.submit(process_file, path, args.out, **options) for path in inputs]
+        for job in as_completed(jobs):
+            result = job.result()
+            results.append(result)
+            print(f"[{result['status']}] {result['file']} ({result['seconds']}s)"
+                  + (f": {result['error']}" if result["status"] == "failed" else ""))
+
+    results.sort(key=lambda r: r["file"])
+    _write_json(os.path.join(args.out, "index.json"), results)
+    failed = sum(r["status"] == "failed" for r in results)
+    print(f"{len(results) - failed}/{len(results)} reports written to {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Precomputed day × product rollup cube for interactive slicing.
+
+The cube is built once per dataset from the cleaned chunks. It keeps daily
+sales sums and order counts per product as sorted NumPy arrays with prefix
+sums, plus the day index where each week and month starts. Any date range,
+granularity (day / week / month) or per-product trend is then answered with
+``searchsorted`` and prefix-sum differences instead of rescanning the rows.
+"""
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = {"Day": "D", "Week": "W", "Month": "M"}
+ALL_PRODUCTS = "All products"
+# Rows without a product still count towards the day totals, but are left
+# out of product rankings
+NO_PRODUCT = "(no product)"
+MAX_PLOT_POINTS = 2000
+
+
+def _period_labels(days, granularity):
+    """Label each day with its period, matching ``resample``: weeks end on
+    Sunday, months on their last day."""
+    if granularity == "D":
+        return days
+    if granularity == "W":
+        weekday = (days.astype("int64") + 3) % 7  # 1970-01-01 was a Thursday
+        return days + (6 - weekday).astype("timedelta64[D]")
+    if granularity == "M":
+        return (days.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class RollupCube:
+    """Daily sums/counts per product, queryable by range, granularity and product.
+
+    ``day_idx`` are day offsets from ``start``; ``prod_idx`` index ``products``.
+    """
+
+    def __init__(self, start, day_idx, prod_idx, sums, counts, products):
+        self.start = np.datetime64(start, "D")
+        self.products = np.asarray(products, dtype=object)
+        self._product_pos = {p: i for i, p in enumerate(self.products)}
+        self.n_days = int(day_idx.max()) + 1 if len(day_idx) else 0
+
+        # Entries sorted by (product, day); one flat key makes every product's
+        # day range a single searchsorted away.
+        order = np.lexsort((day_idx, prod_idx))
+        self._keys = prod_idx[order].astype("int64") * self.n_days + day_idx[order]
+        self._cum_sum = np.concatenate([[0.0], np.cumsum(sums[order], dtype="float64")])
+        self._cum_count = np.concatenate([[0], np.cumsum(counts[order], dtype="int64")])
+
+        day_sum = np.bincount(day_idx, weights=sums, minlength=self.n_days)
+        day_count = np.bincount(day_idx, weights=counts, minlength=self.n_days).astype("int64")
+        self._day_cum_sum = np.concatenate([[0.0], np.cumsum(day_sum)])
+        self._day_cum_count = np.concatenate([[0], np.cumsum(day_count)])
+
+        days = self.start + np.arange(self.n_days)
+        self._periods = {}
+        for g in GRANULARITIES.values():
+            labels = _period_labels(days, g)
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if self.n_days else np.array([], int)
+            self._periods[g] = (starts, labels[starts])
+
+    @classmethod
+    def from_frame(cls, daily):
+        """Build from a frame of ``day``, ``product``, ``sum`` and ``count`` rows,
+        one per (day, product) pair."""
+        if daily.empty:
+            empty = np.array([], dtype="int64")
+            return cls("1970-01-01", empty, empty, np.array([]), empty, [])
+        days = pd.to_datetime(daily["day"]).to_numpy().astype("datetime64[D]")
+        start = days.min()
+        prod_idx, products = pd.factorize(daily["product"].astype(str), sort=True)
+        return cls(
+            start,
+            (days - start).astype("int64"),
+            prod_idx.astype("int64"),
+            daily["sum"].to_numpy(dtype="float64"),
+            daily["count"].to_numpy(dtype="int64"),
+            products,
+        )
+
+    @property
+    def nbytes(self):
+        arrays = [self._keys, self._cum_sum, self._cum_count, self._day_cum_sum, self._day_cum_count]
+        return int(sum(a.nbytes for a in arrays))
+
+    def date_range(self):
+        if not self.n_days:
+            return None, None
+        return pd.Timestamp(self.start), pd.Timestamp(self.start + self.n_days - 1)
+
+    def _day_bounds(self, start, end):
+        """Inclusive/exclusive day offsets for ``[start, end]``, clipped to the data."""
+        lo = 0 if start is None else int((np.datetime64(pd.Timestamp(start).date(), "D") - self.start).astype(int))
+        hi = self.n_days if end is None else int((np.datetime64(pd.Timestamp(end).date(), "D") - self.start).astype(int)) + 1
+        return max(lo, 0), min(hi, self.n_days)
+
+    def _edges(self, granularity, lo, hi):
+        starts, labels = self._periods[granularity]
+        first = np.searchsorted(starts, lo, side="right") - 1
+        last = np.searchsorted(starts, hi - 1, side="right")
+        edges = np.clip(np.r_[starts[first:last], hi], lo, hi)
+        return labels[first:last], edges
+
+    def _product_positions(self, product):
+        pos = self._product_pos.get(product)
+        if pos is None:
+            raise KeyError(f"Unknown product: {product}")
+        return pos
+
+    def series(self, granularity="M", start=None, end=None, products=None):
+        """Sales and order counts per period in ``[start, end]``.
+
+        With ``products`` (a list of names) the result is long-form with a
+        ``product`` column; otherwise it's the total over all products.
+        Partial periods at the range edges only include days inside the range.
+        """
+        lo, hi = self._day_bounds(start, end)
+        if hi <= lo:
+            return pd.DataFrame({"date": pd.to_datetime([]), "sales": [], "orders": []})
+        labels, edges = self._edges(granularity, lo, hi)
+
+        if products is None:
+            return pd.DataFrame({
+                "date": labels.astype("datetime64[ns]"),
+                "sales": np.diff(self._day_cum_sum[edges]),
+                "orders": np.diff(self._day_cum_count[edges]),
+            })
+
+        frames = []
+        for product in products:
+            pos = np.searchsorted(self._keys, self._product_positions(product) * self.n_days + edges)
+            frames.append(pd.DataFrame({
+                "product": product,
+                "date": labels.astype("datetime64[ns]"),
+                "sales": np.diff(self._cum_sum[pos]),
+                "orders": np.diff(self._cum_count[pos]),
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def product_totals(self, start=None, end=None):
+        """Sales per product over ``[start, end]`` in one vectorized pass;
+        rows without a product are excluded."""
+        lo, hi = self._day_bounds(start, end)
+        base = np.arange(len(self.products), dtype="int64") * self.n_days
+        a = np.searchsorted(self._keys, base + lo)
+        b = np.searchsorted(self._keys, base + max(hi, lo))
+        totals = pd.Series(self._cum_sum[b] - self._cum_sum[a], index=self.products)
+        return totals.drop(NO_PRODUCT, errors="ignore")
+
+    def top_products(self, n=10, start=None, end=None):
+        totals = self.product_totals(start, end)
+        return totals[totals > 0].nlargest(n)
+
+
+class RollupBuilder:
+    """Collects cleaned chunks into day × product partial sums, then builds a cube.
+
+    Chunk partials are compacted every ``compact_every`` chunks so the pending
+    list stays bounded by the number of distinct (day, product) pairs.
+    """
+
+    compact_every = 32
+
+    def __init__(self, date_col, sales_col, product_col=None):
+        self.date_col = date_col
+        self.sales_col = sales_col
+        self.product_col = product_col
+        self._parts = []
+
+    def add(self, chunk):
+        if chunk.empty:
+            return
+        days = chunk[self.date_col].dt.floor("D")
+        if self.product_col and self.product_col in chunk.columns:
+            product = chunk[self.product_col]
+            if product.hasnans:
+                if isinstance(product.dtype, pd.CategoricalDtype) and NO_PRODUCT not in product.cat.categories:
+                    product = product.cat.add_categories([NO_PRODUCT])
+                product = product.fillna(NO_PRODUCT)
+        else:
+            product = pd.Series(ALL_PRODUCTS, index=chunk.index)
+        part = chunk[self.sales_col].groupby([days, product], observed=True).agg(["sum", "count"])
+        part.index = part.index.set_levels(part.index.levels[1].astype(str), level=1)
+        self._parts.append(part)
+        if len(self._parts) >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        if len(self._parts) > 1:
+            self._parts = [pd.concat(self._parts).groupby(level=[0, 1]).sum()]
+
+    def build(self):
+        self._compact()
+        if not self._parts:
+            return RollupCube.from_frame(pd.DataFrame(columns=["day", "product", "sum", "count"]))
+        part = self._parts[0]
+        return RollupCube.from_frame(pd.DataFrame({
+            "day": part.index.get_level_values(0),
+            "product": part.index.get_level_values(1),
+            "sum": part["sum"].to_numpy(),
+            "count": part["count"].to_numpy(),
+        }))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points that keep the
+    visual shape of the ``(x, y)`` line."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # Interior points split into n_out - 2 buckets; the endpoints are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df, x_col, y_col, n_out=MAX_PLOT_POINTS):
+    """Thin a long series with LTTB before handing it to ``px.line``."""
+    if len(df) <= n_out:
+        return df
+    x = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.astype("int64")
+    return df.iloc[lttb_indices(x.to_numpy(), df[y_col].to_numpy(), n_out)]
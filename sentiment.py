@@ -0,0 +1,149 @@
+"""Batch sentiment scoring for review uploads and news headlines.
+
+Texts are deduplicated and memoized before scoring, since review exports repeat
+short texts like "Great product!" thousands of times. Large batches of distinct
+texts are scored across a process pool. ``analyze_reviews`` streams a review
+file chunk by chunk, folding each chunk into a per-product
+Positive/Neutral/Negative breakdown and word counts for the word cloud.
+"""
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ingest import CHUNK_ROWS, auto_match_column, iter_chunks
+
+REVIEW_NAMES = ["Review", "Review Text", "Comment", "Feedback", "Text"]
+LABELS = ["Positive", "Neutral", "Negative"]
+TOKEN_RE = r"[a-z][a-z']+"
+
+# Small fallback for when wordcloud isn't installed
+_BASIC_STOPWORDS = {
+    "the", "and", "a", "an", "is", "it", "to", "of", "for", "in", "on", "this",
+    "that", "was", "with", "my", "i", "but", "not", "are", "be", "so", "at", "as",
+}
+
+
+def _stopwords():
+    try:
+        from wordcloud import STOPWORDS
+    except ImportError:
+        return _BASIC_STOPWORDS
+    return STOPWORDS
+
+
+def _score_batch(texts):
+    from textblob import TextBlob
+
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+def label(polarity):
+    return np.where(polarity > 0, "Positive", np.where(polarity < 0, "Negative", "Neutral"))
+
+
+class SentimentEngine:
+    """TextBlob polarity with a text memo and process-pool fan-out.
+
+    Batches with fewer than ``min_parallel`` new texts are scored inline; the
+    pool only pays off once pickling cost is small next to TextBlob's. The
+    engine is shared across Streamlit sessions, so the memo is only touched
+    under a lock and each call resolves from its own copy of the scores.
+    """
+
+    def __init__(self, max_workers=None, batch_size=2000, min_parallel=5000, max_memo=500_000):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.min_parallel = min_parallel
+        self.max_memo = max_memo
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.scored = 0
+        self.memo_hits = 0
+
+    def score(self, texts):
+        """Return a float array of polarities, one per text."""
+        texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+        codes, uniques = pd.factorize(texts)
+        with self._lock:
+            if len(self._memo) + len(uniques) > self.max_memo:
+                self._memo.clear()
+            known = {t: self._memo[t] for t in uniques if t in self._memo}
+        new = [t for t in uniques if t not in known]
+
+        # Score outside the lock; other sessions may clear the memo meanwhile
+        scores = dict(zip(new, self._score_new(new))) if new else {}
+        with self._lock:
+            self._memo.update(scores)
+            self.scored += len(new)
+            self.memo_hits += len(texts) - len(new)
+        known.update(scores)
+
+        polarity = np.array([known[t] for t in uniques], dtype="float64")
+        return polarity[codes]
+
+    def _score_new(self, texts):
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(texts) < self.min_parallel:
+            return [p for batch in batches for p in _score_batch(batch)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return [p for scores in pool.map(_score_batch, batches) for p in scores]
+
+
+def token_counts(texts, stopwords=None):
+    """Word frequencies for a batch of texts, without joining them into one string."""
+    stopwords = _stopwords() if stopwords is None else stopwords
+    tokens = pd.Series(texts, dtype=object).dropna().astype(str).str.lower().str.findall(TOKEN_RE).explode()
+    counts = tokens.dropna().value_counts()
+    return Counter({w: int(n) for w, n in counts.items() if w not in stopwords})
+
+
+def detect_review_columns(sample, product_names=("Product Name", "Item", "Product")):
+    return {
+        "text": auto_match_column(REVIEW_NAMES, sample.columns),
+        "product": auto_match_column(list(product_names), sample.columns),
+    }
+
+
+def analyze_reviews(source, fmt, text_col, product_col=None, engine=None,
+                    chunksize=CHUNK_ROWS, max_words=200):
+    """Stream a review file and return the breakdown, word frequencies and row count.
+
+    ``breakdown`` has one row per product (or a single ``All reviews`` row)
+    with Positive/Neutral/Negative counts and the mean polarity.
+    """
+    engine = engine or SentimentEngine()
+    stopwords = _stopwords()
+    columns = [c for c in (text_col, product_col) if c]
+    counts = None
+    polarity_sums = None
+    words = Counter()
+    rows = 0
+
+    for chunk in iter_chunks(source, fmt, columns=columns, chunksize=chunksize):
+        texts = chunk[text_col]
+        polarity = engine.score(texts)
+        labels = label(polarity)
+        group = chunk[product_col].astype(str) if product_col else pd.Series("All reviews", index=chunk.index)
+
+        part = pd.crosstab(group.to_numpy(), labels).reindex(columns=LABELS, fill_value=0)
+        sums = pd.Series(polarity).groupby(group.to_numpy()).sum()
+        counts = part if counts is None else counts.add(part, fill_value=0)
+        polarity_sums = sums if polarity_sums is None else polarity_sums.add(sums, fill_value=0)
+        words.update(token_counts(texts, stopwords))
+        rows += len(chunk)
+
+    if counts is None:
+        return {"breakdown": pd.DataFrame(columns=LABELS + ["Avg Polarity"]), "words": {}, "rows": 0}
+
+    breakdown = counts.astype("int64")
+    breakdown["Avg Polarity"] = polarity_sums / breakdown[LABELS].sum(axis=1)
+    breakdown.index.name = product_col or "Reviews"
+    breakdown.columns.name = None
+    return {
+        "breakdown": breakdown.loc[breakdown[LABELS].sum(axis=1).sort_values(ascending=False).index],
+        "words": dict(words.most_common(max_words)),
+        "rows": rows,
+    }
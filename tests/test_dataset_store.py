@@ -0,0 +1,121 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import load_dataset
+from dataset_store import DatasetStore, _key_hash, match_order_column
+
+
+def csv_bytes(text):
+    return io.BytesIO(text.encode())
+
+
+def monthly(dataset):
+    return dict(zip(dataset.monthly_sales.iloc[:, 0].dt.strftime("%Y-%m"), dataset.monthly_sales.iloc[:, 1]))
+
+
+def test_order_column_is_never_a_fuzzy_match():
+    assert match_order_column(["Order Date", "Product Name", "Sales", "Qty"]) is None
+    assert match_order_column(["order_id", "Order Date"]) == "order_id"
+    assert match_order_column(["Invoice No", "Sales"], exclude=("Invoice No",)) is None
+
+
+def test_identical_rows_without_order_id_are_kept(tmp_path):
+    text = "Order Date,Product Name,Sales\n01/05/2024,A,10\n01/05/2024,A,10\n02/01/2024,B,5\n"
+    store = DatasetStore(str(tmp_path))
+    result = store.append(csv_bytes(text), "csv")
+    assert result["rows_added"] == 3 and result["duplicates"] == 0
+    assert monthly(store.dataset()) == monthly(load_dataset(csv_bytes(text), "csv")) == {"2024-01": 20.0,
+                                                                                          "2024-02": 5.0}
+
+
+def test_identical_lines_of_one_order_are_kept(tmp_path):
+    text = "Order ID,Order Date,Product Name,Sales\n1,01/05/2024,A,10\n1,01/05/2024,A,10\n2,01/06/2024,A,10\n"
+    store = DatasetStore(str(tmp_path))
+    assert store.append(csv_bytes(text), "csv")["rows_added"] == 3
+    assert monthly(store.dataset()) == {"2024-01": 30.0}
+
+
+def test_overlapping_upload_only_adds_new_rows(tmp_path):
+    history = "Order Date,Product Name,Sales\n01/05/2024,A,10\n01/05/2024,A,10\n01/20/2024,B,7\n"
+    # Same January rows plus one more identical sale and a February order
+    delta = history + "01/05/2024,A,10\n02/02/2024,B,4\n"
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes(history), "csv", digest="h1")
+    result = store.append(csv_bytes(delta), "csv", digest="h2")
+    assert (result["rows_added"], result["duplicates"]) == (2, 3)
+    assert monthly(store.dataset()) == {"2024-01": 37.0, "2024-02": 4.0}
+    assert store.has_upload("h2")
+
+    assert store.append(csv_bytes(delta), "csv")["rows_added"] == 0
+
+
+def test_reupload_with_blank_numbers_still_matches(tmp_path):
+    # The new row's blank Qty makes pandas read the whole column as float ("1.0")
+    history = "Order Date,Product Name,Qty,Sales\n01/05/2024,A,1,10\n01/06/2024,B,2,10\n"
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes(history), "csv")
+    result = store.append(csv_bytes(history + "02/01/2024,C,,5\n"), "csv")
+    assert (result["rows_added"], result["duplicates"]) == (1, 2)
+    assert monthly(store.dataset()) == {"2024-01": 20.0, "2024-02": 5.0}
+
+
+def test_reupload_with_blank_order_id_still_matches(tmp_path):
+    history = "Order ID,Order Date,Product Name,Sales\n10,01/05/2024,A,10\n11,01/06/2024,B,10\n"
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes(history), "csv")
+    result = store.append(csv_bytes(history + ",02/01/2024,C,5\n"), "csv")
+    assert (result["rows_added"], result["duplicates"]) == (1, 2)
+    assert monthly(store.dataset()) == {"2024-01": 20.0, "2024-02": 5.0}
+
+
+def test_key_hash_ignores_inferred_dtype():
+    ints = _key_hash(pd.Series([10, 2, 7]))
+    assert (_key_hash(pd.Series([10.0, 2.0, 7.0])) == ints).all()
+    assert (_key_hash(pd.Series(["10.0", " 2", "7"])) == ints).all()
+    blanks = _key_hash(pd.Series([np.nan, None, ""], dtype=object))
+    assert (blanks == _key_hash(pd.Series([np.nan]))[0]).all()
+    assert len(set(_key_hash(pd.Series(["12345678901234567891", "12345678901234567892", "N/A"])))) == 3
+    assert len(_key_hash(pd.Series([np.nan, np.nan], dtype=object))) == 2
+
+
+def test_store_matches_full_load_and_reopens(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 3000
+    frame = pd.DataFrame({
+        "Order ID": np.arange(n),
+        "Order Date": (pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 500, n)), "D"))
+        .strftime("%m/%d/%Y"),
+        "Product Name": rng.choice(["A", "B", "C"], n),
+        "Sales": [f"${v:,.2f}" for v in rng.uniform(1, 2000, n)],
+    })
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes(frame.iloc[:2000].to_csv(index=False)), "csv", chunksize=700)
+    store.append(csv_bytes(frame.iloc[1500:].to_csv(index=False)), "csv", chunksize=700)
+
+    full = load_dataset(csv_bytes(frame.to_csv(index=False)), "csv")
+    reopened = DatasetStore(str(tmp_path)).dataset()
+    assert reopened.rows_kept == n
+    assert np.allclose(reopened.monthly_sales["Sales"], full.monthly_sales["Sales"])
+    assert np.allclose(reopened.product_sales.sort_index(), full.product_sales.sort_index())
+    assert np.allclose(reopened.rollup.series("W")["sales"], full.rollup.series("W")["sales"])
+
+
+def test_rows_without_product_count_but_are_not_ranked(tmp_path):
+    text = "Order Date,Product Name,Sales\n01/05/2024,,10\n01/06/2024,A,20\n"
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes(text), "csv")
+    dataset = store.dataset()
+    assert monthly(dataset) == {"2024-01": 30.0}
+    assert dataset.rollup.series("M")["sales"].tolist() == [30.0]
+    assert dataset.product_sales.to_dict() == {"A": 20.0}
+    assert dataset.rollup.top_products().to_dict() == {"A": 20.0}
+
+
+def test_mismatched_columns_are_rejected(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    store.append(csv_bytes("Order Date,Product Name,Sales\n01/05/2024,A,10\n"), "csv")
+    with pytest.raises(ValueError):
+        store.append(csv_bytes("Date,Item,Revenue\n01/05/2024,A,10\n"), "csv")
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import forecasting
+from forecasting import ForecastCache, backtest, forecast_many
+
+
+def monthly(n, start=100.0):
+    return pd.DataFrame({"ds": pd.date_range("2021-01-31", periods=n, freq="M"),
+                         "y": start + np.arange(n) * 10.0})
+
+
+def test_backtest_reports_failing_engine_without_hiding_others(monkeypatch):
+    real_fit = forecasting.fit_model
+
+    def fit(history, engine="prophet", settings=None):
+        if engine == "prophet":
+            raise RuntimeError("prophet unavailable")
+        return real_fit(history, engine, settings)
+
+    monkeypatch.setattr(forecasting, "fit_model", fit)
+    scores = backtest(monthly(24)).set_index("engine")
+    assert scores.loc["prophet", "error"] == "prophet unavailable"
+    assert scores.loc[["ets", "seasonal_naive"], "error"].isna().all()
+    assert scores.loc["ets", "mae"] < 1e-6
+
+
+def test_backtest_is_cached_per_series(tmp_path, monkeypatch):
+    cache = ForecastCache(str(tmp_path))
+    history = monthly(24)
+    first = backtest(history, engines=("ets",), cache=cache)
+
+    monkeypatch.setattr(forecasting, "fit_model", lambda *a, **k: 1 / 0)
+    assert backtest(history, engines=("ets",), cache=cache) is first
+    assert backtest(monthly(24, start=50.0), engines=("ets",), cache=cache)["error"].notna().all()
+
+
+def test_forecast_many_skips_short_histories(tmp_path):
+    cache = ForecastCache(str(tmp_path))
+    results = forecast_many({"short": monthly(1), "long": monthly(12)}, periods=3, engine="ets", cache=cache)
+    assert list(results) == ["long"]
+    assert len(results["long"]) == 15
+    assert forecast_many({"short": monthly(1)}, engine="ets") == {}
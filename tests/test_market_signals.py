@@ -0,0 +1,126 @@
+import pytest
+
+import market_signals
+from market_signals import (FakeNewsProvider, FakeTrendsProvider, MarketSignalFetcher, NewsProvider, TrendsProvider,
+                            TTLCache, with_retry)
+
+PRODUCTS = [f"Product {i}" for i in range(12)]
+
+
+def fetcher_for(tmp_path, trends=None, news=None, **kwargs):
+    return MarketSignalFetcher(trends, news, cache_dir=str(tmp_path), backoff=0.0, **kwargs)
+
+
+class FailingTrends(TrendsProvider):
+    def fetch(self, keywords, timeframe):
+        raise RuntimeError("429 Too Many Requests")
+
+
+class FailingNews(NewsProvider):
+    def fetch(self, query):
+        raise RuntimeError("apiKeyInvalid")
+
+
+class FlakyNews(FakeNewsProvider):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def fetch(self, query):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("reset by peer")
+        return super().fetch(query)
+
+
+def test_trends_are_batched_five_keywords_per_call(tmp_path):
+    trends, news = FakeTrendsProvider(), FakeNewsProvider()
+    signals = fetcher_for(tmp_path, trends, news).fetch(PRODUCTS)
+    assert trends.calls == 3
+    assert news.calls == 12
+    assert set(signals) == set(PRODUCTS)
+    for s in signals.values():
+        assert s["trend_error"] is None and s["news_error"] is None
+        assert 1 <= s["trend_score"] <= 100
+        assert len(s["headlines"]) == 3 and len(s["related"]) == 3
+
+
+def test_second_fetch_is_served_from_cache(tmp_path):
+    trends, news = FakeTrendsProvider(), FakeNewsProvider()
+    fetcher = fetcher_for(tmp_path, trends, news)
+    first = fetcher.fetch(PRODUCTS)
+    assert fetcher.fetch(PRODUCTS) == first
+    assert (trends.calls, news.calls) == (3, 12)
+    assert fetcher.cache.hits == 24
+
+
+def test_cached_signals_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(market_signals.time, "time", lambda: now[0])
+    trends = FakeTrendsProvider()
+    fetcher = fetcher_for(tmp_path, trends, ttl=60)
+    fetcher.fetch(PRODUCTS[:5])
+    now[0] += 30
+    fetcher.fetch(PRODUCTS[:5])
+    assert trends.calls == 1
+    now[0] += 31
+    fetcher.fetch(PRODUCTS[:5])
+    assert trends.calls == 2
+
+
+def test_fresh_fetcher_reloads_disk_cache(tmp_path):
+    first = fetcher_for(tmp_path, FakeTrendsProvider(), FakeNewsProvider()).fetch(PRODUCTS)
+    trends, news = FakeTrendsProvider(), FakeNewsProvider()
+    assert fetcher_for(tmp_path, trends, news).fetch(PRODUCTS) == first
+    assert (trends.calls, news.calls) == (0, 0)
+
+
+def test_ttl_cache_ignores_corrupt_disk_entries(tmp_path):
+    cache = TTLCache(cache_dir=str(tmp_path))
+    cache.put(("news", "A"), ["headline"])
+    for path in tmp_path.iterdir():
+        path.write_text("{not json")
+    assert TTLCache(cache_dir=str(tmp_path)).get(("news", "A")) is None
+
+
+def test_with_retry_recovers_from_transient_failures():
+    attempts = []
+
+    def flaky(x):
+        attempts.append(x)
+        if len(attempts) < 3:
+            raise ConnectionError("try again")
+        return x * 2
+
+    assert with_retry(flaky, 21, attempts=3, backoff=0.0) == 42
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(ConnectionError):
+        with_retry(flaky, 1, attempts=2, backoff=0.0)
+    assert len(attempts) == 2
+
+
+def test_fetcher_retries_flaky_provider(tmp_path):
+    news = FlakyNews(failures=2)
+    signals = fetcher_for(tmp_path, news=news, attempts=3).fetch(["A"])
+    assert signals["A"]["news_error"] is None
+    assert len(signals["A"]["headlines"]) == 3
+
+
+def test_provider_failures_are_isolated(tmp_path):
+    signals = fetcher_for(tmp_path, FailingTrends(), FakeNewsProvider(), attempts=2).fetch(["A", "B"])
+    for s in signals.values():
+        assert "429" in s["trend_error"] and s["trend_score"] == 0.0 and s["related"] == []
+        assert s["news_error"] is None and len(s["headlines"]) == 3
+
+    signals = fetcher_for(tmp_path / "other", FakeTrendsProvider(), FailingNews(), attempts=1).fetch(["A"])
+    assert signals["A"]["trend_error"] is None and signals["A"]["trend_score"] > 0
+    assert signals["A"]["news_error"] == "apiKeyInvalid" and signals["A"]["headlines"] == []
+
+
+def test_failed_lookups_are_not_cached(tmp_path):
+    fetcher_for(tmp_path, FailingTrends(), attempts=1).fetch(["A"])
+    trends = FakeTrendsProvider()
+    assert fetcher_for(tmp_path, trends).fetch(["A"])["A"]["trend_error"] is None
+    assert trends.calls == 1
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from normalize import DateNormalizer, MoneyNormalizer, date_parse_rate, money_parse_rate
+
+
+def parse_money(values, decimal="."):
+    return MoneyNormalizer(decimal)(pd.Series(values, dtype=object)).tolist()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("$1,234.56", 1234.56),
+    ("1234.5", 1234.5),
+    ("(12.00)", -12.0),
+    ("$(5.00)", -5.0),
+    ("-12.5", -12.5),
+    ("12.50-", -12.5),
+    ("USD 1,000", 1000.0),
+    ("1 234,50 €", 1234.5),
+    ("€1.234,56", 1234.56),
+    ("1,5", 1.5),
+    ("1.234.567", 1234567.0),
+])
+def test_money_values(raw, expected):
+    assert parse_money([raw]) == [expected]
+
+
+@pytest.mark.parametrize("raw", ["2024-01-05", "SKU-123", "CA-2016-152156", "N/A", "", "-", "(5", "$-(5)"])
+def test_money_rejects_non_money(raw):
+    normalizer = MoneyNormalizer()
+    assert np.isnan(normalizer(pd.Series([raw], dtype=object))[0])
+    assert normalizer.counts == {"money:rejected": 1}
+
+
+def test_money_ambiguous_separator_follows_sniffed_decimal():
+    assert parse_money(["1,234", "1.234"], decimal=".") == [1234.0, 1.234]
+    assert parse_money(["1,234", "1.234"], decimal=",") == [1.234, 1234.0]
+
+
+def test_money_counts_rules_per_row():
+    normalizer = MoneyNormalizer()
+    normalizer(pd.Series(["$5", "$5", "(3)", "7", "1,000", "junk", None], dtype=object))
+    assert normalizer.counts == {"money:currency_symbol": 2, "money:parentheses": 1, "money:plain": 1,
+                                 "money:thousands": 1, "money:rejected": 2}
+
+
+def test_money_sniffs_decimal_comma():
+    assert MoneyNormalizer.from_sample(pd.Series(["1.234,56", "12,50", "3,00"])).decimal == ","
+    assert MoneyNormalizer.from_sample(pd.Series(["1,234.56", "12.50", "3.00"])).decimal == "."
+
+
+def test_parse_rates_separate_dates_from_money():
+    dates = pd.Series(["2024-01-05", "2024-02-11", "2024-03-09"])
+    order_ids = pd.Series(["CA-2016-152156", "CA-2016-138688", "US-2015-108966"])
+    assert money_parse_rate(dates) == 0.0
+    assert money_parse_rate(order_ids) == 0.0
+    assert date_parse_rate(dates) == 1.0
+    assert money_parse_rate(pd.Series(["$5.00", "$1,200.00", "(3.50)"])) == 1.0
+
+
+def test_dates_sniffed_format_with_fallback():
+    normalizer = DateNormalizer.from_sample(pd.Series(["01/05/2024", "02/11/2024", "12/31/2024"]))
+    out = normalizer(pd.Series(["01/05/2024", "2024-02-11", "not a date", None]))
+    assert out.tolist()[:2] == [pd.Timestamp("2024-01-05"), pd.Timestamp("2024-02-11")]
+    assert out[2:].isna().all()
+    assert normalizer.counts == {"date:%m/%d/%Y": 1, "date:fallback": 1, "date:rejected": 2}
+
+
+def test_dates_memo_survives_clearing():
+    normalizer = DateNormalizer("%Y-%m-%d")
+    normalizer.max_memo = 2
+    normalizer(pd.Series(["2024-01-01", "2024-01-02"]))
+    out = normalizer(pd.Series(["2024-01-01", "2024-01-03", "2024-01-04"]))
+    assert out.notna().all()
+
+
+def test_dates_unlisted_timestamp_format():
+    stamps = pd.Timestamp("2024-03-01 08:00") + pd.to_timedelta(np.arange(0, 5000 * 97, 97), "min")
+    raw = pd.Series(stamps.strftime("%d %B %Y %H:%M"))
+    normalizer = DateNormalizer.from_sample(raw.head(200))
+    assert normalizer.fmt == "%d %B %Y %H:%M"
+    out = normalizer(raw)
+    assert (out.to_numpy() == stamps.to_numpy()).all()
+    assert normalizer.counts == {"date:%d %B %Y %H:%M": 5000, "date:rejected": 0}
+
+
+def test_dates_timezone_and_mixed_fallbacks():
+    normalizer = DateNormalizer("%m/%d/%Y %H:%M:%S")
+    out = normalizer(pd.Series(["01/05/2024 10:00:00", "2024-01-05T10:00:00Z", "2024-01-05T12:00:00+02:00",
+                                "Jan 7 2024 1:45PM", "junk"]))
+    assert out.tolist()[:4] == [pd.Timestamp("2024-01-05 10:00")] * 3 + [pd.Timestamp("2024-01-07 13:45")]
+    assert pd.isna(out[4])
+    assert normalizer.counts == {"date:%m/%d/%Y %H:%M:%S": 1, "date:fallback": 3, "date:rejected": 1}
+
+
+def test_dates_memoized_across_chunks():
+    days = pd.Series(pd.date_range("2024-01-01", periods=10).strftime("%m/%d/%Y"))
+    chunk = pd.concat([days] * 5, ignore_index=True)
+    normalizer = DateNormalizer("%m/%d/%Y")
+    first, second = normalizer(chunk), normalizer(chunk)
+    assert (first == second).all() and len(normalizer._memo_index) == 10
+    assert normalizer.counts["date:%m/%d/%Y"] == 100
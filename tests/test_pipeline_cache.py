@@ -0,0 +1,82 @@
+import threading
+
+import pandas as pd
+
+from pipeline_cache import PipelineCache, make_cache_key
+
+
+def frame(n):
+    return pd.DataFrame({"x": range(n)})
+
+
+def test_cache_key_depends_on_bytes_and_mapping():
+    key = make_cache_key(b"a,b\n1,2\n", {"date": "a"})
+    assert key == make_cache_key(b"a,b\n1,2\n", {"date": "a"})
+    assert key != make_cache_key(b"a,b\n1,3\n", {"date": "a"})
+    assert key != make_cache_key(b"a,b\n1,2\n", {"date": "b"})
+
+
+def test_hits_misses_and_lru_eviction(tmp_path):
+    size = int(frame(100).memory_usage(deep=True).sum())
+    cache = PipelineCache(max_bytes=2 * size + 10, spill_dir=str(tmp_path))
+    cache.put("a", frame(100), {})
+    cache.put("b", frame(100), {})
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.put("c", frame(100), {})
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_large_frames_spill_to_parquet(tmp_path):
+    cache = PipelineCache(spill_threshold=100, spill_dir=str(tmp_path))
+    cache.put("big", frame(1000), {"total": pd.Series([1.0])})
+    assert cache.stats()["disk_bytes"] > 0
+    assert len(list(tmp_path.iterdir())) == 1
+
+    df, aggregates = cache.get("big")
+    assert df["x"].tolist() == list(range(1000))
+    assert aggregates["total"].tolist() == [1.0]
+
+    # Replacing an entry keeps its new spill file
+    cache.put("big", frame(500), {})
+    assert len(cache.get("big")[0]) == 500
+
+    cache.clear()
+    assert len(cache) == 0 and list(tmp_path.iterdir()) == []
+
+
+def test_spill_file_removed_counts_as_miss(tmp_path):
+    cache = PipelineCache(spill_threshold=100, spill_dir=str(tmp_path))
+    cache.put("big", frame(1000), {})
+    for path in tmp_path.iterdir():
+        path.unlink()
+    assert cache.get("big") is None
+    assert "big" not in cache
+
+
+def test_concurrent_sessions(tmp_path):
+    cache = PipelineCache(max_bytes=int(frame(50).memory_usage(deep=True).sum()) * 3, spill_dir=str(tmp_path))
+    errors = []
+
+    def session(worker):
+        try:
+            for i in range(300):
+                key = f"{(worker + i) % 8}"
+                if cache.get(key) is None:
+                    cache.put(key, frame(50), {})
+        except Exception as e:  # pragma: no cover - surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 300
+    assert stats["entries"] <= 3
@@ -0,0 +1,50 @@
+import importlib
+import json
+import sys
+
+import profiling
+
+
+def test_stages_accumulate_rows_and_calls():
+    profiler = profiling.StageProfiler()
+    for chunk in profiler.iterate("read", [[1, 2], [3, 4, 5]]):
+        with profiler.stage("parse", len(chunk)):
+            pass
+    report = {r["stage"]: r for r in profiler.report()}
+    assert (report["read"]["calls"], report["read"]["rows"]) == (2, 5)
+    assert (report["parse"]["calls"], report["parse"]["rows"]) == (2, 5)
+    assert json.loads(profiler.to_json(source="x"))["source"] == "x"
+
+
+def test_current_rss_never_falls_back_to_the_peak(monkeypatch):
+    # Without /proc or psutil the lifetime peak isn't a current reading
+    monkeypatch.setattr(sys, "platform", "darwin")
+    monkeypatch.setattr(profiling, "_psutil_memory", lambda: None)
+    assert profiling.rss_bytes() is None
+    assert profiling.peak_rss_bytes() is not None
+
+
+def test_stage_helper_is_a_no_op_without_profiler():
+    with profiling.stage(None, "anything", 10):
+        pass
+    assert list(profiling.iterate(None, "read", [1, 2])) == [1, 2]
+
+
+def test_works_without_resource_or_psutil(monkeypatch):
+    # Windows has neither the resource module nor /proc
+    monkeypatch.setitem(sys.modules, "resource", None)
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    monkeypatch.setattr(sys, "platform", "win32")
+    try:
+        module = importlib.reload(profiling)
+        assert module.resource is None
+        profiler = module.StageProfiler()
+        with profiler.stage("load", 100):
+            pass
+        [row] = profiler.report()
+        assert row["rows"] == 100 and row["peak_rss_mb"] is None and row["rss_delta_mb"] is None
+        assert json.loads(profiler.to_json())["process_peak_rss_mb"] is None
+        assert module.rss_bytes() is None
+    finally:
+        monkeypatch.undo()
+        importlib.reload(profiling)
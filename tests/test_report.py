@@ -0,0 +1,26 @@
+import json
+
+import pandas as pd
+
+from report import main
+
+
+def test_same_stem_different_format_get_separate_reports(tmp_path):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    sales = pd.DataFrame({
+        "Order Date": pd.date_range("2023-01-01", periods=120, freq="5D").strftime("%m/%d/%Y"),
+        "Product Name": ["A", "B", "C"] * 40,
+        "Sales": [f"${v:,.2f}" for v in range(100, 220)],
+    })
+    sales.to_csv(inputs / "store1.csv", index=False)
+    sales.to_parquet(inputs / "store1.parquet", index=False)
+
+    out = tmp_path / "out"
+    assert main([str(inputs), "--out", str(out), "--workers", "1", "--no-advisor"]) == 0
+    index = json.loads((out / "index.json").read_text())
+    assert sorted(r["output"] for r in index) == [str(out / "store1.csv"), str(out / "store1.parquet")]
+    for name in ("store1.csv", "store1.parquet"):
+        summary = json.loads((out / name / "summary.json").read_text())
+        assert summary["source"].endswith(name)
+        assert (out / name / "forecast.parquet").exists()
@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from core import load_dataset
+from rollup import NO_PRODUCT, RollupCube, downsample
+
+
+def load_csv(text, **kwargs):
+    return load_dataset(io.BytesIO(text.encode()), "csv", **kwargs)
+
+
+def test_rows_without_product_count_in_day_totals():
+    dataset = load_csv("Order Date,Product Name,Sales\n01/05/2024,,10\n01/06/2024,A,20\n02/03/2024,A,5\n")
+    monthly = dataset.rollup.series("M")
+    assert monthly["sales"].tolist() == dataset.monthly_sales["Sales"].tolist() == [30.0, 5.0]
+    assert monthly["orders"].tolist() == [2, 1]
+    assert dataset.rollup.top_products().to_dict() == {"A": 25.0}
+    assert NO_PRODUCT not in dataset.rollup.product_totals().index
+
+
+def test_series_matches_resample():
+    rng = np.random.default_rng(0)
+    days = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 400, 5000), "D")
+    frame = pd.DataFrame({"day": days, "product": rng.choice(["A", "B", "C"], 5000), "sales": rng.uniform(1, 9, 5000)})
+    daily = frame.groupby(["day", "product"])["sales"].agg(["sum", "count"]).reset_index()
+    cube = RollupCube.from_frame(daily)
+
+    for granularity in ("D", "W", "M"):
+        expected = frame.set_index("day")["sales"].resample(granularity).sum()
+        got = cube.series(granularity)
+        assert np.allclose(got["sales"], expected.to_numpy())
+        assert (got["date"].to_numpy() == expected.index.to_numpy()).all()
+
+    start, end = "2023-03-15", "2023-07-02"
+    in_range = frame[frame["day"].between(start, end)]
+    per_product = cube.series("M", start, end, products=["B"])
+    assert np.isclose(per_product["sales"].sum(), in_range.loc[in_range["product"] == "B", "sales"].sum())
+    assert np.allclose(cube.product_totals(start, end).sort_index(),
+                       in_range.groupby("product")["sales"].sum().sort_index())
+
+
+def test_downsample_keeps_endpoints():
+    df = pd.DataFrame({"x": np.arange(10_000), "y": np.sin(np.arange(10_000) / 50)})
+    thin = downsample(df, "x", "y", 100)
+    assert len(thin) == 100
+    assert thin["x"].iloc[0] == 0 and thin["x"].iloc[-1] == 9_999
@@ -0,0 +1,79 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import sentiment
+from market_signals import FakeNewsProvider
+from sentiment import SentimentEngine, analyze_reviews, token_counts
+
+
+def fake_scores(texts):
+    return [{"good": 0.5, "bad": -0.5}.get(t, 0.0) for t in texts]
+
+
+def test_score_maps_polarities_back_to_rows(monkeypatch):
+    monkeypatch.setattr(sentiment, "_score_batch", fake_scores)
+    engine = SentimentEngine()
+    assert engine.score(["good", "bad", "good", None, "meh"]).tolist() == [0.5, -0.5, 0.5, 0.0, 0.0]
+    assert engine.scored == 4
+
+
+def test_score_memo_reuses_texts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sentiment, "_score_batch", lambda texts: calls.append(list(texts)) or fake_scores(texts))
+    engine = SentimentEngine()
+    engine.score(["good", "bad"])
+    engine.score(["bad", "good", "new"])
+    assert calls == [["good", "bad"], ["new"]]
+
+
+def test_score_survives_memo_eviction(monkeypatch):
+    monkeypatch.setattr(sentiment, "_score_batch", fake_scores)
+    engine = SentimentEngine(max_memo=5)
+    engine.score(["good", "bad", "ok"])
+    out = engine.score(["good", "x1", "x2", "x3"])
+    assert out.tolist() == [0.5, 0.0, 0.0, 0.0]
+
+
+def test_score_is_safe_across_sessions(monkeypatch):
+    def slow_scores(texts):
+        time.sleep(0.001)
+        return [float(t.split("-")[1]) for t in texts]
+
+    monkeypatch.setattr(sentiment, "_score_batch", slow_scores)
+    engine = SentimentEngine(max_memo=20)
+
+    def session(n):
+        texts = [f"t-{(n * 7 + i) % 40}" for i in range(15)]
+        for _ in range(20):
+            assert engine.score(texts).tolist() == [float(t.split("-")[1]) for t in texts]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(session, range(8)))
+
+
+def test_score_headlines_from_fake_news(monkeypatch):
+    monkeypatch.setattr(sentiment, "_score_batch", fake_scores)
+    headlines = FakeNewsProvider().fetch("Widget")
+    assert len(headlines) == 3 and all("Widget" in h for h in headlines)
+    assert len(SentimentEngine().score(headlines)) == 3
+
+
+def test_analyze_reviews_breakdown(monkeypatch):
+    monkeypatch.setattr(sentiment, "_score_batch", fake_scores)
+    csv = pd.DataFrame({"Product": ["A", "A", "B", "A"], "Review": ["good", "bad", "good", "good"]}).to_csv(index=False)
+    result = analyze_reviews(io.BytesIO(csv.encode()), "csv", "Review", "Product", engine=SentimentEngine(),
+                             chunksize=2)
+    breakdown = result["breakdown"]
+    assert result["rows"] == 4
+    assert breakdown.loc["A", ["Positive", "Neutral", "Negative"]].tolist() == [2, 0, 1]
+    assert np.isclose(breakdown.loc["A", "Avg Polarity"], 0.5 / 3)
+    assert result["words"] == {"good": 3, "bad": 1}
+
+
+def test_token_counts_skips_stopwords():
+    assert token_counts(["The battery is great", "great price"], {"the", "is"}) == {"great": 2, "battery": 1,
+                                                                                   "price": 1}